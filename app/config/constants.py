@@ -10,7 +10,106 @@ MAX_QUERY_LENGTH = 2500 # Query máximo de 2500 caracteres
 
 # Configurações de processamento
 MAX_RETRIES = 3 # Máximo de 3 retentativas no OCR
-MAX_CONCURRENT_PROCESSES = 3 # Máximo de 5 processos concorrentes
+OCR_POOL_WORKERS = None # Workers do pool de OCR (None = um por núcleo disponível)
+OCR_PAGE_PARALLELISM = 4 # Máximo de 4 páginas de um mesmo PDF processadas em paralelo (apenas com núcleos ociosos no pool)
+
+# Cliente da Groq (compartilhado pela aplicação)
+LLM_MAX_CONNECTIONS = 100 # Máximo de conexões HTTP simultâneas com a API
+LLM_MAX_KEEPALIVE_CONNECTIONS = 20 # Conexões mantidas abertas para reuso
+LLM_KEEPALIVE_EXPIRY = 30 # Segundos até uma conexão ociosa ser fechada
+LLM_TIMEOUT = 60 # Timeout (s) de cada requisição à API
+LLM_JSON_MODE = True # Solicita respostas da análise em modo JSON (response_format)
+LLM_CLIENT_MAX_RETRIES = 0 # Retentativas internas do SDK (0: 429s e retentativas ficam com o escalonador e os serviços)
+
+# Escalonador de chamadas ao provedor (limites aplicados por modelo)
+LLM_REQUESTS_PER_MINUTE = 30 # Limite de requisições por minuto da conta na Groq
+LLM_TOKENS_PER_MINUTE = 30000 # Limite de tokens por minuto da conta na Groq
+LLM_OUTPUT_TOKENS_ESTIMATE = 500 # Tokens de resposta estimados quando a chamada não define max_tokens
+LLM_IMAGE_TOKENS_ESTIMATE = 1500 # Tokens estimados por imagem enviada ao modelo de visão
+LLM_INITIAL_CONCURRENCY = 4 # Chamadas simultâneas por modelo no início (ajustadas por AIMD)
+LLM_MIN_CONCURRENCY = 1 # Mínimo de chamadas simultâneas por modelo
+LLM_MAX_CONCURRENCY = 32 # Máximo de chamadas simultâneas por modelo
+LLM_LATENCY_TARGET = 20 # Respostas acima de 20s reduzem a concorrência
+LLM_RATE_LIMIT_BACKOFF = 2 # Pausa (s) após um 429 sem cabeçalho retry-after
+
+# Circuit breaker do provedor (compartilhado entre requisições)
+LLM_CIRCUIT_WINDOW_SIZE = 20 # Chamadas consideradas no cálculo da taxa de falhas
+LLM_CIRCUIT_MIN_CALLS = 5 # Mínimo de chamadas na janela antes de avaliar a taxa de falhas
+LLM_CIRCUIT_FAILURE_RATE = 0.5 # Taxa de falhas (erros ou chamadas lentas) que abre o circuito
+LLM_CIRCUIT_SLOW_CALL_SECONDS = 30 # Chamadas mais lentas que 30s contam como falha
+LLM_CIRCUIT_OPEN_SECONDS = 30 # Tempo (s) com o circuito aberto antes de enviar sondas
+LLM_CIRCUIT_PROBE_CALLS = 1 # Sondas simultâneas no estado semiaberto
+DEGRADED_SUMMARY_TOKEN_BUDGET = 200 # Orçamento do trecho do texto extraído retornado no modo degradado
+
+# Ranqueamento com query
+MAX_RANKED_RESULTS = 5 # Máximo de 5 candidatos retornados no ranqueamento
+LLM_TWO_PHASE_RANKING = True # Fase 1 pontua todos os currículos; fase 2 gera resumos apenas para o top MAX_RANKED_RESULTS
+LLM_SCORE_MAX_TOKENS = 32 # Limite de tokens da resposta da fase 1 (apenas o score)
+
+# Pré-ranqueamento léxico (BM25) antes do LLM
+LEXICAL_PRERANK_TOP_K = 10 # Apenas os 10 currículos com maior pontuação BM25 são enviados ao LLM (None desativa)
+LEXICAL_BM25_K1 = 1.5 # Saturação da frequência dos termos
+LEXICAL_BM25_B = 0.75 # Normalização pelo tamanho do texto
+
+# Engine do Tesseract
+OCR_ENGINE = "tesserocr" # "tesserocr" (API C, handles persistentes) ou "pytesseract" (subprocesso por imagem)
+TESSERACT_LANG = "por+eng" # Idiomas carregados pelo Tesseract
+TESSDATA_PATH = "/usr/share/tesseract-ocr/5/tessdata/" # Diretório dos modelos (traineddata) usados pelo tesserocr
+TESSERACT_OMP_THREADS = 1 # Threads OpenMP internas do Tesseract (o paralelismo vem do pool)
+
+# Normalização de resolução antes do OCR
+OCR_TARGET_TEXT_HEIGHT = 24 # Altura mediana ideal dos caracteres (px) para o Tesseract
+OCR_TEXT_HEIGHT_RANGE = (18, 32) # Fora desta faixa de altura (px) a imagem é redimensionada
+OCR_DPI_RANGE = (200, 400) # Faixa de DPI aceita quando não há texto mensurável
+OCR_MAX_UPSCALE = 2.0 # Ampliação máxima de imagens em baixa resolução
+
+# OCR adaptativo
+OCR_CONFIDENCE_THRESHOLD = 75 # Abaixo desta confiança média (0-100) a página recebe o preprocessamento completo
+
+# Rasterização de PDFs de imagem
+PDF_RASTER_BACKEND = "pymupdf" # "pymupdf" (página a página) ou "pdf2image" (poppler, documento inteiro)
+PDF_RASTER_DPI = 300 # Resolução de renderização das páginas para o OCR
+PDF_PAGE_MIN_TEXT_CHARS = 100 # Páginas com menos de 100 caracteres de texto nativo passam por OCR
+
+# Validação visual das páginas de PDFs de imagem
+PDF_PAGE_VALIDATION_POLICY = "first" # "first" (primeira página), "first_n" (primeiras N), "sampled" (N distribuídas) ou "all"
+PDF_PAGE_VALIDATION_PAGES = 3 # Número de páginas validadas nas políticas "first_n" e "sampled"
+PDF_PAGE_VALIDATION_CONCURRENT = False # Valida as páginas em paralelo com o OCR (antecipa a chamada ao modelo de visão)
+
+# Miniaturas enviadas ao modelo de visão na validação
+VALIDATION_THUMBNAIL_MAX_SIDE = 1024 # Maior lado da miniatura (px)
+VALIDATION_THUMBNAIL_QUALITY = 70 # Qualidade JPEG da miniatura
+VALIDATION_THUMBNAIL_GRAYSCALE = True # Envia a miniatura em escala de cinza
+VALIDATION_THUMBNAIL_CACHE_ITEMS = 128 # Máximo de 128 miniaturas no cache em memória
 
 # Extensões permitidas
-ALLOWED_EXTENSIONS = {'.pdf', '.png', '.jpg', '.jpeg'} 
\ No newline at end of file
+ALLOWED_EXTENSIONS = {'.pdf', '.png', '.jpg', '.jpeg'}
+
+# Cache de extração de texto (chaveado pelo SHA-256 do arquivo)
+OCR_CACHE_MEMORY_ITEMS = 256 # Máximo de 256 resultados no cache em memória
+OCR_CACHE_DIR = "cache/ocr" # Diretório do cache em disco
+OCR_CACHE_DISK_MAX_BYTES = 200 * 1024 * 1024 # Máximo de 200MB no cache em disco
+OCR_CACHE_MAX_AGE = 7 * 24 * 60 * 60 # Registros expiram após 7 dias
+
+# Cache de resultados da análise do LLM (chaveado pelo texto do currículo, query, modelo e versão do prompt)
+LLM_CACHE_MEMORY_ITEMS = 1024 # Máximo de 1024 análises no cache em memória
+LLM_CACHE_DIR = "cache/llm" # Diretório do cache em disco
+LLM_CACHE_DISK_MAX_BYTES = 50 * 1024 * 1024 # Máximo de 50MB no cache em disco
+LLM_CACHE_MAX_AGE = 7 * 24 * 60 * 60 # Análises expiram após 7 dias
+
+# Cache de validação de queries (chaveado pelo texto normalizado da query)
+QUERY_CACHE_MAX_ITEMS = 512 # Máximo de 512 vereditos em memória
+QUERY_CACHE_TTL = 24 * 60 * 60 # Vereditos expiram após 24 horas
+
+# Pré-classificação local de currículos (antes da validação com LLM)
+RESUME_ACCEPT_THRESHOLD = 0.9 # Pontuação a partir da qual o texto é aceito sem chamar o LLM
+RESUME_REJECT_THRESHOLD = 0.05 # Pontuação até a qual o texto é rejeitado sem chamar o LLM
+
+# Compactação do texto dos currículos antes dos prompts
+RESUME_TOKEN_BUDGET = 2500 # Orçamento de tokens do currículo no prompt de análise
+VALIDATION_TOKEN_BUDGET = 750 # Orçamento de tokens do texto no prompt de validação
+CHARS_PER_TOKEN = 4 # Estimativa de caracteres por token
+
+# Modo de validação de PDFs de texto: "two_step" (validação e análise em chamadas separadas)
+# ou "combined" (uma única chamada retorna o veredito de currículo junto com score e resumo)
+LLM_VALIDATION_MODE = "two_step"
@@ -1,13 +1,18 @@
+import asyncio
+import contextlib
 from typing import List, Optional
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends
 import time
 
 from ..models.models import AnalysisResponse
-from ..config.constants import MAX_USER_ID_LENGTH, MAX_QUERY_LENGTH, MAX_RETRIES
+from ..config.constants import MAX_USER_ID_LENGTH, MAX_QUERY_LENGTH, MAX_RETRIES, MAX_RANKED_RESULTS
 from ..utils.utils import validate_form_inputs, validate_file_list, get_score
 from ..services.analyze_service import process_resumes_concurrently
 from ..services.database_service import get_database_dependency, log_request_async
+from ..services.circuit_breaker import CircuitOpenError
+from ..services.llm_scheduler import provider_available
 from ..services.llm_service import validate_query
+from ..services.prompt_templates import PROMPT_VERSION
 import logging
 
 logger = logging.getLogger(__name__)
@@ -15,6 +20,24 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/analyze", tags=["Análise de Currículos"])
 
 
+async def _validate_query_or_skip(query: str) -> bool:
+    """Valida a query; se o provedor ficar indisponível, a validação é dispensada (modo degradado)."""
+    try:
+        return await validate_query(query)
+    except CircuitOpenError:
+        logger.warning("🟠 Provedor de IA indisponível, validação da query dispensada")
+        return True
+
+
+def _rank_key(result: dict) -> tuple[bool, float, float]:
+    """
+    Chave de ordenação dos resultados com query: currículos pontuados pelo LLM vêm antes
+    dos resultados do modo degradado ("Não avaliado"), ordenados pela pontuação léxica.
+    """
+    scored = isinstance(result.get("score"), (int, float))
+    return scored, get_score(result), result.get("lexical_score", 0.0)
+
+
 @router.post(
     "/", 
     summary="Analisa Currículos com IA",
@@ -37,6 +60,15 @@ Processa um ou múltiplos currículos usando OCR e IA para extrair informações
 
 ### Campos Opcionais
 - `query`: Descrição do perfil para análise direcionada (máx. 2500 caracteres)
+- `bypass_cache`: Ignora o cache de análises do LLM (padrão: `false`)
+
+## Modo Degradado
+
+Se o provedor de IA estiver indisponível, a requisição não falha: os currículos
+retornam com um trecho do texto extraído no lugar do resumo e a pontuação
+"Não avaliado". Com query, a pontuação do pré-ranqueamento léxico (0 a 1) vem
+em `lexical_score` e esses currículos são listados depois dos avaliados pela IA.
+A resposta traz `degraded: true`.
 
 ## Modos de Operação
 
@@ -93,6 +125,7 @@ curl -X POST "http://localhost:8000/analyze/" \
 ```
     """,
     response_model=AnalysisResponse,
+    response_model_exclude_none=True,
     responses={
         200: {
             "description": "Análise realizada com sucesso",
@@ -467,6 +500,16 @@ async def analyze_resumes(
         example="Desenvolvedor React Senior: TypeScript, Next.js, microservices, AWS, Docker, testes automatizados, liderança técnica",
         max_length=MAX_QUERY_LENGTH
     ),
+    bypass_cache: bool = Form(
+        default=False,
+        description="""
+**Ignora o cache de análises do LLM**
+
+- **Formato**: Booleano
+- **Obrigatório**: Não (padrão: `false`)
+- **Comportamento**: Todos os currículos são reanalisados pelo LLM; os novos resultados substituem os armazenados
+        """,
+    ),
     db_available: bool = Depends(get_database_dependency)
 ):
     start_time = time.time()
@@ -486,19 +529,38 @@ async def analyze_resumes(
     if query == "":
         query = None
 
-    # Valida a query se fornecida
-    if query:
-        flag = validate_query(query)
+    # Com o circuit breaker do provedor aberto, a requisição segue direto no modo degradado
+    # (apenas OCR e pré-ranqueamento léxico), sem aguardar chamadas que falhariam
+    degraded = not provider_available()
+    if degraded:
+        logger.warning(f"🟠 Provedor de IA indisponível, requisição processada no modo degradado - {request_id}")
+
+    # Valida a query em paralelo com o processamento dos arquivos: leitura e OCR começam
+    # imediatamente e apenas a análise do LLM aguarda o veredito
+    query_validation = asyncio.create_task(_validate_query_or_skip(query)) if query and not degraded else None
+
+    logger.debug(f"🔄 Iniciando processamento de {len(files)} arquivo(s) - {request_id}")
+    processing = asyncio.create_task(process_resumes_concurrently(files, query, query_validation, use_cache=not bypass_cache, degraded=degraded))
+
+    if query_validation is not None:
+        try:
+            flag = await query_validation
+        except BaseException:
+            processing.cancel()
+            raise
+
         if not flag:
+            # Cancela o processamento em andamento antes de rejeitar a requisição
+            processing.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await processing
             logger.warning(f"⚠️ Query inválida rejeitada - request_id: {request_id}, user_id: {user_id}")
             raise HTTPException(
                 status_code=422, 
                 detail="Query inválida. Por favor forneça uma query relevante para uma análise de currículo."
             )
 
-    # Processamento dos arquivos
-    logger.debug(f"🔄 Iniciando processamento de {len(files)} arquivo(s) - {request_id}")
-    all_results = await process_resumes_concurrently(files, query)
+    all_results = await processing
     
     # Formatação dos resultados
     successful_results = [res for res in all_results if "error" not in res]
@@ -539,10 +601,11 @@ async def analyze_resumes(
         )
 
     if query:
-        sorted_results = sorted(successful_results, key=get_score, reverse=True)
-        if len(sorted_results) > 5:
-            sorted_results = sorted_results[:5]
-            logger.debug(f"🔝 Resultados limitados aos top 5 candidatos - {request_id}")
+        # No ranqueamento em duas fases, apenas os melhores pontuados recebem resumo
+        sorted_results = [res for res in sorted(successful_results, key=_rank_key, reverse=True) if "summary" in res]
+        if len(sorted_results) > MAX_RANKED_RESULTS:
+            sorted_results = sorted_results[:MAX_RANKED_RESULTS]
+            logger.debug(f"🔝 Resultados limitados aos top {MAX_RANKED_RESULTS} candidatos - {request_id}")
             
         final_response = {
             "request_id": request_id,
@@ -553,6 +616,7 @@ async def analyze_resumes(
             "request_id": request_id,
             "results": successful_results
         }
+    final_response["degraded"] = any(res.get("degraded") for res in final_response["results"])
     
     # Log no Banco de Dados
     log_entry = {
@@ -560,6 +624,9 @@ async def analyze_resumes(
         "user_id": user_id,
         "query": query, 
         "resultado": final_response["results"],
+        "prompt_version": PROMPT_VERSION,
+        "lexical_prefiltered": [res for res in successful_results if "lexical_score" in res and "summary" not in res],
+        "degraded": final_response["degraded"],
         "processing_time": processing_time,
         "file_count": len(files),
         "success_count": len(successful_results),
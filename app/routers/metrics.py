@@ -0,0 +1,58 @@
+from fastapi import APIRouter
+
+from ..services import llm_scheduler, metrics_service
+
+router = APIRouter(prefix="/metrics", tags=["Métricas"])
+
+
+def _ratio(numerator: float, denominator: float) -> float | None:
+    return numerator / denominator if denominator else None
+
+
+@router.get(
+    "/",
+    summary="Métricas de processamento",
+    description="""
+Retorna as métricas acumuladas desde o início da aplicação.
+
+- **counters**: Contadores (ex.: páginas processadas pelo OCR, páginas escaladas)
+- **histograms**: Distribuições com contagem, média, mínimo, máximo e contagem por bucket
+- **rates**: Taxas derivadas dos contadores (ex.: taxa de escalonamento do OCR, taxa de rejeição por modo de validação)
+- **llm_circuit_state**: Estado do circuit breaker do provedor de IA (`closed`, `open` ou `half_open`)
+    """,
+)
+async def get_metrics():
+    metrics = metrics_service.snapshot()
+    metrics["llm_circuit_state"] = llm_scheduler.circuit_state()
+    counters = metrics["counters"]
+    metrics["rates"] = {
+        "ocr_escalation_rate": _ratio(counters.get("ocr_pages_escalated", 0), counters.get("ocr_pages_total", 0)),
+    }
+    metrics["rates"]["llm_analysis_parse_failure_rate"] = _ratio(
+        counters.get("llm_analysis_parse_failures", 0), counters.get("llm_analysis_requests", 0)
+    )
+    metrics["rates"]["llm_analysis_retry_rate"] = _ratio(
+        counters.get("llm_analysis_retries", 0), counters.get("llm_analysis_requests", 0)
+    )
+    metrics["rates"]["llm_analysis_cache_hit_rate"] = _ratio(
+        counters.get("llm_analysis_cache_hits", 0),
+        counters.get("llm_analysis_cache_hits", 0) + counters.get("llm_analysis_cache_misses", 0),
+    )
+    metrics["rates"]["llm_rate_limited_rate"] = _ratio(
+        counters.get("llm_rate_limited", 0), counters.get("llm_scheduler_requests", 0)
+    )
+    metrics["rates"]["llm_circuit_rejection_rate"] = _ratio(
+        counters.get("llm_circuit_rejected_calls", 0),
+        counters.get("llm_circuit_rejected_calls", 0) + counters.get("llm_scheduler_requests", 0),
+    )
+    metrics["rates"]["degraded_result_rate"] = _ratio(
+        counters.get("degraded_results", 0), counters.get("llm_analysis_requests", 0) + counters.get("degraded_results", 0)
+    )
+    metrics["rates"]["resume_text_compaction_ratio"] = _ratio(
+        counters.get("resume_text_chars_compacted", 0), counters.get("resume_text_chars_raw", 0)
+    )
+    for mode in ("two_step", "combined"):
+        metrics["rates"][f"validation_{mode}_rejection_rate"] = _ratio(
+            counters.get(f"validation_{mode}_rejected", 0), counters.get(f"validation_{mode}_files", 0)
+        )
+    return metrics
@@ -1,12 +1,23 @@
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
-from typing import List, Optional, Union
+import logging
+from typing import Awaitable, List, Optional, Union
 
 from fastapi import UploadFile
 
 from . import ocr_service
 from . import llm_service
-from ..config.constants import MAX_RETRIES, MAX_CONCURRENT_PROCESSES
+from . import metrics_service
+from .ocr_pool import run_in_pool
+from ..config.constants import (
+    MAX_RETRIES, LLM_VALIDATION_MODE, PDF_PAGE_VALIDATION_CONCURRENT,
+    LLM_TWO_PHASE_RANKING, MAX_RANKED_RESULTS, LEXICAL_PRERANK_TOP_K, DEGRADED_SUMMARY_TOKEN_BUDGET
+)
+from ..utils.cache import hash_bytes
+from ..utils import lexical_ranker
+from ..utils.text_compaction import compact_resume_text
+from ..utils.utils import get_score
+
+logger = logging.getLogger(__name__)
 
 async def _validate_file_content(file: UploadFile) -> dict:
     """Valida o conteúdo do arquivo de forma assíncrona."""
@@ -25,29 +36,64 @@ async def _validate_file_content(file: UploadFile) -> dict:
         return {"filename": filename, "error": f"Erro ao ler arquivo: {str(e)}"}
 
 async def _run_ocr(file_bytes: bytes, filename: str) -> Union[ocr_service.OcrResponse, ocr_service.OcrError]:
-    """Executa OCR usando thread pool."""
-    loop = asyncio.get_event_loop()
-    with ThreadPoolExecutor() as executor:
-        return await loop.run_in_executor(
-            executor, 
-            ocr_service.extract_text_from_file, 
-            file_bytes, 
-            filename
-        )
-
-async def _run_llm_analysis(text: str, query: Optional[str]) -> Union[llm_service.AnalysisResponse, llm_service.AnalysisResponseNoQuery, llm_service.AnalysisError]:
-    """Executa análise LLM usando thread pool."""
-    loop = asyncio.get_event_loop()
-    with ThreadPoolExecutor() as executor:
-        return await loop.run_in_executor(
-            executor, 
-            llm_service.get_llm_analysis, 
-            text, 
-            query
-        )
-
-async def _process_single_resume(file: UploadFile, query: Optional[str]) -> dict:
-    """Processa um único currículo com retry automático."""
+    """Executa OCR no pool de processos compartilhado."""
+    return await run_in_pool(ocr_service.extract_text_from_file, file_bytes, filename)
+
+async def _validate_pages_speculatively(file_bytes: bytes, file_hash: str, filename: str):
+    """
+    Valida com o modelo de visão as páginas de um PDF de imagem enquanto o OCR roda.
+
+    Retorna None se o PDF tiver camada de texto (a validação, se necessária, usa o texto).
+    """
+    page_indexes = await run_in_pool(ocr_service.validation_pages, file_bytes)
+    thumbnails = await ocr_service.get_validation_thumbnails(file_bytes, file_hash, filename, page_indexes) if page_indexes else []
+    if not thumbnails:
+        return None
+    return await ocr_service.validate_thumbnails(thumbnails, filename)
+
+def _record_ocr_metrics(result: ocr_service.OcrResponse, filename: str):
+    """Registra a confiança e o escalonamento das páginas processadas com OCR."""
+    for page in result.pages:
+        metrics_service.increment("ocr_pages_total")
+        if page.escalated:
+            metrics_service.increment("ocr_pages_escalated")
+        metrics_service.observe("ocr_fast_path_confidence", page.fast_confidence)
+        metrics_service.observe("ocr_final_confidence", page.confidence)
+
+    if result.pages:
+        escalated = sum(page.escalated for page in result.pages)
+        mean_confidence = sum(page.confidence for page in result.pages) / len(result.pages)
+        logger.debug(f"🔎 OCR {filename}: {len(result.pages)} página(s), {escalated} escalada(s), confiança média {mean_confidence:.0f}")
+
+async def _run_llm_analysis(text: str, query: Optional[str], validate_resume: bool = False, requirements: Optional[str] = None, score_only: bool = False, use_cache: bool = True) -> Union[llm_service.AnalysisResponse, llm_service.AnalysisResponseNoQuery, llm_service.ScoreResponse, llm_service.AnalysisError]:
+    """Executa análise LLM com o cliente assíncrono compartilhado (score_only: fase 1 do ranqueamento)."""
+    if score_only:
+        return await llm_service.get_llm_score(text, query, validate_resume, requirements, use_cache=use_cache)
+    return await llm_service.get_llm_analysis(text, query, validate_resume, requirements, use_cache=use_cache)
+
+async def _extract_requirements(query: str) -> Optional[str]:
+    """Extrai os requisitos da query; em caso de falha, a análise usa a query completa."""
+    try:
+        requirements = await llm_service.extract_requirements(query)
+    except Exception as e:
+        logger.warning(f"⚠️ Falha na extração de requisitos da query: {str(e)[:100]}...")
+        requirements = None
+    metrics_service.increment("query_requirements_extracted" if requirements else "query_requirements_fallbacks")
+    return requirements
+
+def _record_validation_metrics(rejected: bool):
+    """Conta arquivos e rejeições por modo de validação, para comparar os modos (A/B)."""
+    metrics_service.increment(f"validation_{LLM_VALIDATION_MODE}_files")
+    if rejected:
+        metrics_service.increment(f"validation_{LLM_VALIDATION_MODE}_rejected")
+
+async def _extract_resume(file: UploadFile) -> dict:
+    """
+    Lê o arquivo e extrai o texto com retry automático (OCR, cache e validação de conteúdo).
+
+    Retorna um dicionário com "error" em caso de falha, ou com "file_hash" e
+    "extracted" (OcrResponse) em caso de sucesso.
+    """
     filename = file.filename
     
     # Validações básicas
@@ -56,53 +102,311 @@ async def _process_single_resume(file: UploadFile, query: Optional[str]) -> dict
         return validation_result
     
     file_bytes = validation_result["file_bytes"]
+    file_hash = hash_bytes(file_bytes)
     
     # OCR com retry
     for attempt in range(MAX_RETRIES):
-        try:
-            extracted_text = await _run_ocr(file_bytes, filename)
-        except Exception as e:
-            if attempt < MAX_RETRIES - 1:
-                await asyncio.sleep(0.5 * (attempt + 1))
-                continue
-            else:
-                return {"filename": filename, "error": f"Erro de OCR: {str(e)}"}
+        extracted_text = await ocr_service.get_cached_result(file_hash)
+        if extracted_text is not None:
+            logger.debug(f"⚡ Resultado de OCR obtido do cache: {filename} ({file_hash[:12]})")
+        else:
+            # No modo concorrente, a validação visual das páginas começa junto com o OCR
+            speculative_validation = None
+            if PDF_PAGE_VALIDATION_CONCURRENT and filename.lower().endswith('.pdf'):
+                speculative_validation = asyncio.create_task(_validate_pages_speculatively(file_bytes, file_hash, filename))
+
+            try:
+                extracted_text = await _run_ocr(file_bytes, filename)
+
+                if isinstance(extracted_text, ocr_service.OcrResponse):
+                    _record_ocr_metrics(extracted_text, filename)
+
+                    # Validação com IA dos casos incertos para o classificador local
+                    # (no modo combinado, textos sem miniaturas são validados junto com a análise)
+                    if not extracted_text.validated and (extracted_text.thumbnail_pages or LLM_VALIDATION_MODE != "combined"):
+                        extracted_text = await ocr_service.validate_extraction(extracted_text, filename, file_bytes, file_hash, speculative_validation)
+                        speculative_validation = None
+            except Exception as e:
+                if attempt < MAX_RETRIES - 1:
+                    await asyncio.sleep(0.5 * (attempt + 1))
+                    continue
+                else:
+                    return {"filename": filename, "error": f"Erro de OCR: {str(e)}"}
+            finally:
+                if speculative_validation is not None:
+                    speculative_validation.cancel()
+
+            # Textos com a validação adiada por indisponibilidade do provedor não entram no cache
+            # (no modo combinado, validated=False é o resultado esperado e é armazenado)
+            if not (isinstance(extracted_text, ocr_service.OcrResponse) and not extracted_text.validated and LLM_VALIDATION_MODE != "combined"):
+                await ocr_service.cache_result(file_hash, extracted_text)
+            if isinstance(extracted_text, ocr_service.OcrResponse):
+                if extracted_text.validated:
+                    _record_validation_metrics(rejected=False)
+            elif extracted_text.rejected:
+                _record_validation_metrics(rejected=True)
         
         if isinstance(extracted_text, ocr_service.OcrError):
             return {"filename": filename, "error": f"Erro de OCR: {extracted_text.error}"}
 
-        # Análise do LLM
+        return {"filename": filename, "file_hash": file_hash, "extracted": extracted_text}
+
+    # Erro final
+    return {"filename": filename, "error": "Não foi possível processar o currículo após os retries."}
+
+async def _analyze_resume(
+    extraction: dict,
+    query: Optional[str],
+    query_gate: Optional[Awaitable[bool]] = None,
+    requirements_task: Optional[Awaitable[Optional[str]]] = None,
+    score_only: bool = False,
+    use_cache: bool = True,
+) -> dict:
+    """
+    Analisa com o LLM o texto extraído por _extract_resume.
+
+    Se query_gate for informado (validação da query em andamento), a análise aguarda
+    o veredito. Da mesma forma, requirements_task (extração dos requisitos da query,
+    compartilhada pelo lote) só é aguardada aqui.
+
+    Com score_only (fase 1 do ranqueamento), o LLM retorna apenas a pontuação e o
+    resultado inclui o texto compactado em "resume_text", usado na fase 2.
+    Com use_cache=False, o cache de análises do LLM é ignorado.
+    """
+    filename = extraction["filename"]
+    file_hash = extraction["file_hash"]
+    extracted_text = extraction["extracted"]
+
+    # A análise só começa depois que a query for aprovada
+    if query_gate is not None and not await asyncio.shield(query_gate):
+        return {"filename": filename, "error": "Query inválida."}
+
+    # Requisitos da vaga extraídos uma vez por lote (None: usa o prompt com a query completa)
+    requirements = await asyncio.shield(requirements_task) if requirements_task is not None else None
+
+    # Análise do LLM (no modo combinado, também valida textos ainda não validados)
+    validate_resume = not extracted_text.validated
+    resume_text = compact_resume_text(extracted_text.text)
+    metrics_service.increment("resume_text_chars_raw", len(extracted_text.text))
+    metrics_service.increment("resume_text_chars_compacted", len(resume_text))
+    try:
+        analysis = await _run_llm_analysis(resume_text, query, validate_resume, requirements, score_only, use_cache)
+    except Exception as e:
+        return {"filename": filename, "error": f"Erro na análise de IA: {str(e)}"}
+    
+    if isinstance(analysis, llm_service.AnalysisError):
+        if analysis.unavailable:
+            # Provedor indisponível: o arquivo segue no modo degradado
+            return {"filename": filename, "degraded_text": extracted_text.text}
+        if analysis.rejected:
+            # Rejeição vinda da validação combinada: mesmo formato e cache das rejeições do OCR
+            rejection = ocr_service.OcrError(error=f"Arquivo {filename} rejeitado, não é um currículo", rejected=True)
+            await ocr_service.cache_result(file_hash, rejection)
+            _record_validation_metrics(rejected=True)
+            return {"filename": filename, "error": f"Erro de OCR: {rejection.error}"}
+        return {"filename": filename, "error": f"Erro na análise de IA: {analysis.error}"}
+
+    if validate_resume:
+        await ocr_service.cache_result(file_hash, ocr_service.OcrResponse(text=extracted_text.text))
+        _record_validation_metrics(rejected=False)
+
+    if score_only:
+        return {"filename": filename, "score": analysis.score, "resume_text": resume_text}
+    
+    # Sucesso em ambas as operações
+    return {
+        "filename": filename,
+        "score": analysis.score,
+        "summary": analysis.summary
+    }
+
+async def _process_single_resume(
+    file: UploadFile,
+    query: Optional[str],
+    query_gate: Optional[Awaitable[bool]] = None,
+    requirements_task: Optional[Awaitable[Optional[str]]] = None,
+    score_only: bool = False,
+    use_cache: bool = True,
+) -> dict:
+    """
+    Processa um único currículo: extração do texto e, em seguida, análise do LLM.
+
+    A leitura e o OCR começam imediatamente; apenas a análise aguarda query_gate
+    e requirements_task (ver _analyze_resume).
+    """
+    extraction = await _extract_resume(file)
+    if "error" in extraction:
+        return extraction
+    return await _analyze_resume(extraction, query, query_gate, requirements_task, score_only, use_cache)
+
+def _prerank(query: str, extractions: List[Union[dict, BaseException]]) -> tuple[List[int], dict[int, float]]:
+    """
+    Pré-ranqueamento léxico (BM25) dos textos extraídos com sucesso.
+
+    Retorna os índices (em extractions) dos LEXICAL_PRERANK_TOP_K melhores, que seguem
+    para o LLM, e a pontuação léxica de todos os textos pontuados.
+    """
+    extracted = [i for i, extraction in enumerate(extractions) if isinstance(extraction, dict) and "extracted" in extraction]
+    selected, scores = lexical_ranker.top_k(query, [extractions[i]["extracted"].text for i in extracted], LEXICAL_PRERANK_TOP_K)
+    lexical_scores = {index: round(float(score), 3) for index, score in zip(extracted, scores)}
+    return [extracted[position] for position in selected], lexical_scores
+
+def _degraded_result(filename: str, score: Union[float, str], text: str, lexical_score: Optional[float] = None) -> dict:
+    """Resultado do modo degradado: um trecho do texto extraído no lugar do resumo do LLM."""
+    result = {
+        "filename": filename,
+        "score": score,
+        "summary": compact_resume_text(text, DEGRADED_SUMMARY_TOKEN_BUDGET),
+        "degraded": True,
+    }
+    if lexical_score is not None:
+        result["lexical_score"] = lexical_score
+    return result
+
+def _resolve_degraded(results: List[Union[dict, BaseException]], query: Optional[str]) -> List[Union[dict, BaseException]]:
+    """
+    Converte os arquivos que não puderam ser analisados pelo LLM (provedor indisponível)
+    em resultados do modo degradado.
+
+    A pontuação fica como "Não avaliado": com query, a pontuação do pré-ranqueamento
+    léxico (BM25, de 0 a 1, relativa ao melhor arquivo degradado) vai em "lexical_score",
+    em uma escala separada das pontuações do LLM.
+    """
+    degraded = [i for i, result in enumerate(results) if isinstance(result, dict) and "degraded_text" in result]
+    if not degraded:
+        return results
+
+    texts = [results[i]["degraded_text"] for i in degraded]
+    lexical_scores = [round(float(score), 3) for score in lexical_ranker.bm25_scores(query, texts)] if query else [None] * len(texts)
+
+    results = list(results)
+    for i, text, lexical_score in zip(degraded, texts, lexical_scores):
+        results[i] = _degraded_result(results[i]["filename"], "Não avaliado", text, lexical_score)
+
+    metrics_service.increment("degraded_results", len(degraded))
+    logger.warning(f"🟠 {len(degraded)} arquivo(s) retornado(s) no modo degradado (apenas OCR e pré-ranqueamento local)")
+    return results
+
+async def _summarize_ranked(
+    results: List[Union[dict, BaseException]],
+    query: str,
+    requirements_task: Optional[Awaitable[Optional[str]]],
+    use_cache: bool = True,
+) -> List[Union[dict, BaseException]]:
+    """
+    Fase 2 do ranqueamento: gera os resumos apenas dos MAX_RANKED_RESULTS melhores currículos.
+
+    Os candidatos são resumidos em ordem de pontuação; se o resumo de um deles falhar,
+    ele passa a ser um erro e o próximo da fila é resumido em seu lugar. Os demais
+    currículos ficam no resultado apenas com a pontuação.
+    """
+    scored = [result for result in results if isinstance(result, dict) and "resume_text" in result]
+    ranked = sorted(scored, key=get_score, reverse=True)
+    requirements = await asyncio.shield(requirements_task) if requirements_task is not None else None
+
+    async def summarize(candidate: dict) -> dict:
         try:
-            analysis = await _run_llm_analysis(extracted_text.text, query)
+            analysis = await llm_service.get_llm_analysis(candidate["resume_text"], query, requirements=requirements, score=candidate["score"], use_cache=use_cache)
         except Exception as e:
-            return {"filename": filename, "error": f"Erro na análise de IA: {str(e)}"}
-        
+            analysis = llm_service.AnalysisError(error=str(e))
         if isinstance(analysis, llm_service.AnalysisError):
-            return {"filename": filename, "error": f"Erro na análise de IA: {analysis.error}"}
-        
-        # Sucesso em ambas as operações
-        return {
-            "filename": filename,
-            "score": analysis.score,
-            "summary": analysis.summary
-        }
+            if analysis.unavailable:
+                # Provedor indisponível: mantém a pontuação da fase 1, com um trecho do texto como resumo
+                return _degraded_result(candidate["filename"], candidate["score"], candidate["resume_text"])
+            return {"filename": candidate["filename"], "error": f"Erro na análise de IA: {analysis.error}"}
+        return {"filename": candidate["filename"], "score": analysis.score, "summary": analysis.summary}
 
-    # Erro final
-    return {"filename": filename, "error": "Não foi possível processar o currículo após os retries."}
+    summarized = {}
+    position = 0
+    while position < len(ranked) and sum("error" not in result for result in summarized.values()) < MAX_RANKED_RESULTS:
+        missing = MAX_RANKED_RESULTS - sum("error" not in result for result in summarized.values())
+        batch = ranked[position:position + missing]
+        position += len(batch)
+        for candidate, result in zip(batch, await asyncio.gather(*(summarize(candidate) for candidate in batch))):
+            summarized[id(candidate)] = result
+
+    metrics_service.increment("ranking_summaries_requested", len(summarized))
+    metrics_service.increment("ranking_summaries_skipped", len(ranked) - len(summarized))
+    logger.debug(f"🔝 Resumos gerados para {len(summarized)} de {len(ranked)} currículo(s) pontuado(s)")
+
+    final_results = []
+    for result in results:
+        if isinstance(result, dict) and "resume_text" in result:
+            result = summarized.get(id(result), {"filename": result["filename"], "score": result["score"]})
+        final_results.append(result)
+    return final_results
+
+async def process_resumes_concurrently(
+    files: List[UploadFile],
+    query: Optional[str],
+    query_gate: Optional[Awaitable[bool]] = None,
+    use_cache: bool = True,
+    degraded: bool = False,
+) -> List[dict]:
+    """
+    Processa os currículos.
+
+    Parâmetros:
+        files: arquivos enviados
+        query: texto da vaga (opcional)
+        query_gate: validação da query em andamento (opcional); a análise do LLM
+            de cada arquivo aguarda seu veredito
+        use_cache: se False, ignora o cache de análises do LLM (os resultados novos são armazenados)
+        degraded: modo degradado (provedor indisponível); apenas extrai os textos e os
+            pontua com o pré-ranqueamento léxico, sem chamadas ao LLM
 
-async def process_resumes_concurrently(files: List[UploadFile], query: Optional[str]) -> List[dict]:
-    """Processa os currículos."""
+    Com query e mais de LEXICAL_PRERANK_TOP_K arquivos, os textos são pré-ranqueados
+    com BM25 e apenas os melhores são analisados pelo LLM; os demais retornam apenas
+    com "lexical_score".
+    """
     
-    # Semáforo para lidar com concorrências
-    semaphore = asyncio.Semaphore(MAX_CONCURRENT_PROCESSES)
+    # Sem semáforo por requisição: o OCR é limitado pelo pool de processos e as chamadas
+    # ao LLM pelo escalonador (llm_scheduler), ambos compartilhados entre as requisições
+
+    # Os requisitos da vaga são extraídos uma única vez para todo o lote, em paralelo com o OCR
+    requirements_task = asyncio.create_task(_extract_requirements(query)) if query and not degraded else None
+    
+    # Com query, a fase 1 do ranqueamento pede apenas a pontuação de cada currículo
+    two_phase = bool(query) and LLM_TWO_PHASE_RANKING and not degraded
     
-    async def process_with_semaphore(file: UploadFile) -> dict:
-        async with semaphore:
-            return await _process_single_resume(file, query)
+    # Com mais arquivos que LEXICAL_PRERANK_TOP_K, apenas os melhores no BM25 seguem para o LLM
+    prerank = bool(query) and LEXICAL_PRERANK_TOP_K is not None and len(files) > LEXICAL_PRERANK_TOP_K
     
-    # Executa todos os processamentos de forma concorrente
-    tasks = [process_with_semaphore(file) for file in files]
-    results = await asyncio.gather(*tasks, return_exceptions=True)
+    try:
+        if degraded:
+            extractions = await asyncio.gather(*(_extract_resume(file) for file in files), return_exceptions=True)
+            results = [
+                {"filename": extraction["filename"], "degraded_text": extraction["extracted"].text}
+                if isinstance(extraction, dict) and "extracted" in extraction else extraction
+                for extraction in extractions
+            ]
+        elif prerank:
+            # Todos os textos precisam estar extraídos antes do pré-ranqueamento
+            extractions = await asyncio.gather(*(_extract_resume(file) for file in files), return_exceptions=True)
+            selected, lexical_scores = _prerank(query, extractions)
+            analyses = await asyncio.gather(*(_analyze_resume(extractions[i], query, query_gate, requirements_task, two_phase, use_cache) for i in selected), return_exceptions=True)
+
+            results = [
+                {"filename": extraction["filename"], "lexical_score": lexical_scores[i]} if i in lexical_scores else extraction
+                for i, extraction in enumerate(extractions)
+            ]
+            for i, analysis in zip(selected, analyses):
+                results[i] = analysis
+
+            skipped = len(lexical_scores) - len(selected)
+            metrics_service.increment("lexical_prerank_skipped", skipped)
+            logger.debug(f"📚 Pré-ranqueamento léxico: {len(selected)} de {len(lexical_scores)} currículo(s) enviados ao LLM")
+        else:
+            # Executa todos os processamentos de forma concorrente
+            tasks = [_process_single_resume(file, query, query_gate, requirements_task, two_phase, use_cache) for file in files]
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        if two_phase:
+            results = await _summarize_ranked(results, query, requirements_task, use_cache)
+        results = _resolve_degraded(results, query)
+    finally:
+        if requirements_task is not None:
+            requirements_task.cancel()
     
     # Processa os resultados e trata exceções
     processed_results = []
@@ -0,0 +1,133 @@
+import logging
+import time
+from collections import deque
+from typing import Optional
+
+from . import metrics_service
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Chamada recusada sem contato com o provedor porque o circuit breaker está aberto."""
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker das chamadas a um provedor, compartilhado entre requisições.
+
+    Estados:
+        - closed: chamadas liberadas; os resultados das últimas window_size chamadas
+          são registrados e, com pelo menos min_calls resultados, uma taxa de falhas
+          (erros ou respostas mais lentas que slow_call_seconds) a partir de
+          failure_rate abre o circuito
+        - open: chamadas recusadas imediatamente com CircuitOpenError durante open_seconds
+        - half_open: até probe_calls chamadas de teste simultâneas; se todas as sondas
+          forem bem-sucedidas o circuito fecha, e qualquer falha o reabre
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        window_size: int,
+        min_calls: int,
+        failure_rate: float,
+        slow_call_seconds: float,
+        open_seconds: float,
+        probe_calls: int,
+    ):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.probe_calls = probe_calls
+        self._outcomes: deque[bool] = deque(maxlen=window_size)
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._transition(self.HALF_OPEN)
+        return self._state
+
+    def is_open(self) -> bool:
+        """True se as chamadas estão sendo recusadas (circuito aberto, fora da janela de sondas)."""
+        return self.state == self.OPEN
+
+    def before_call(self) -> bool:
+        """
+        Autoriza uma chamada. Lança CircuitOpenError se o circuito estiver aberto
+        ou se as sondas do estado half_open já estiverem em andamento.
+
+        Retorna:
+            True se a chamada é uma sonda (deve ser informada em record com probe=True).
+        """
+        state = self.state
+        if state == self.CLOSED:
+            return False
+        if state == self.HALF_OPEN and self._probes_in_flight < self.probe_calls:
+            self._probes_in_flight += 1
+            return True
+
+        metrics_service.increment("llm_circuit_rejected_calls")
+        raise CircuitOpenError(f"Serviço de IA indisponível (circuito {self.name} aberto)")
+
+    def record(self, success: Optional[bool], latency: float, probe: bool = False):
+        """
+        Registra o resultado de uma chamada autorizada por before_call.
+
+        Parâmetros:
+            success: True/False, ou None para resultados neutros (ex.: 429, erros de requisição)
+            latency: duração da chamada (s); acima de slow_call_seconds conta como falha
+            probe: valor retornado por before_call
+        """
+        if success and latency > self.slow_call_seconds:
+            success = False
+            metrics_service.increment("llm_circuit_slow_calls")
+
+        if probe:
+            self._probes_in_flight = max(self._probes_in_flight - 1, 0)
+            if self._state != self.HALF_OPEN:
+                return
+            if success is False:
+                self._open("sonda falhou")
+            elif success:
+                self._probe_successes += 1
+                if self._probe_successes >= self.probe_calls:
+                    self._transition(self.CLOSED)
+            return
+
+        if success is None or self._state != self.CLOSED:
+            return
+
+        self._outcomes.append(success)
+        failures = self._outcomes.count(False)
+        if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.failure_rate:
+            self._open(f"{failures} falha(s) nas últimas {len(self._outcomes)} chamadas")
+
+    def _open(self, reason: str):
+        self._opened_at = time.monotonic()
+        if self._state != self.OPEN:
+            logger.error(f"🔴 Circuito {self.name} aberto por {self.open_seconds}s: {reason}")
+        self._transition(self.OPEN)
+
+    def _transition(self, state: str):
+        if state == self._state:
+            return
+        self._state = state
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        if state == self.CLOSED:
+            self._outcomes.clear()
+            logger.info(f"🟢 Circuito {self.name} fechado, chamadas normalizadas")
+        elif state == self.HALF_OPEN:
+            logger.info(f"🟡 Circuito {self.name} semiaberto, enviando sondas")
+        metrics_service.increment(f"llm_circuit_{state}_transitions")
@@ -0,0 +1,65 @@
+import logging
+import os
+from typing import Optional
+
+import httpx
+from groq import AsyncGroq
+
+from ..config.constants import (
+    LLM_MAX_CONNECTIONS, LLM_MAX_KEEPALIVE_CONNECTIONS, LLM_KEEPALIVE_EXPIRY, LLM_TIMEOUT, LLM_CLIENT_MAX_RETRIES
+)
+
+logger = logging.getLogger(__name__)
+
+_client: Optional[AsyncGroq] = None
+
+
+def _create_client() -> AsyncGroq:
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=LLM_KEEPALIVE_EXPIRY,
+        ),
+        timeout=LLM_TIMEOUT,
+    )
+    # As retentativas (e o tratamento de 429) ficam com o llm_scheduler e os serviços
+    client = AsyncGroq(api_key=os.getenv("GROQ_API_KEY"), http_client=http_client, max_retries=LLM_CLIENT_MAX_RETRIES)
+    logger.info(f"🔗 Cliente Groq iniciado (até {LLM_MAX_CONNECTIONS} conexões, {LLM_MAX_KEEPALIVE_CONNECTIONS} em keep-alive)")
+    return client
+
+
+def start_llm_client():
+    """
+    Cria o cliente assíncrono da Groq compartilhado pela aplicação.
+
+    Esta função deve ser chamada no startup da aplicação.
+    """
+    global _client
+    if _client is None:
+        _client = _create_client()
+
+
+async def close_llm_client():
+    """
+    Fecha o cliente da Groq e o pool de conexões HTTP.
+
+    Esta função deve ser chamada no shutdown da aplicação.
+    """
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+        logger.info("🔌 Cliente Groq encerrado")
+
+
+def get_llm_client() -> AsyncGroq:
+    """
+    Retorna o cliente compartilhado da Groq.
+
+    Se o cliente não foi iniciado (ex.: uso fora da aplicação), ele é criado
+    na primeira chamada.
+    """
+    if _client is None:
+        start_llm_client()
+    return _client
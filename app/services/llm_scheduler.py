@@ -0,0 +1,250 @@
+import asyncio
+import contextlib
+import logging
+import time
+from typing import Any, Optional
+
+from . import metrics_service
+from .circuit_breaker import CircuitBreaker
+from .llm_client import get_llm_client
+from ..config.constants import (
+    LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE, LLM_OUTPUT_TOKENS_ESTIMATE, LLM_IMAGE_TOKENS_ESTIMATE,
+    LLM_INITIAL_CONCURRENCY, LLM_MIN_CONCURRENCY, LLM_MAX_CONCURRENCY, LLM_LATENCY_TARGET, LLM_RATE_LIMIT_BACKOFF,
+    LLM_CIRCUIT_WINDOW_SIZE, LLM_CIRCUIT_MIN_CALLS, LLM_CIRCUIT_FAILURE_RATE, LLM_CIRCUIT_SLOW_CALL_SECONDS,
+    LLM_CIRCUIT_OPEN_SECONDS, LLM_CIRCUIT_PROBE_CALLS
+)
+from ..utils.text_compaction import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Tempos de espera (s) registrados no histograma do escalonador
+WAIT_BUCKETS = (0.01, 0.1, 0.5, 1, 2, 5, 10, 30, 60)
+
+# Circuit breaker único para o provedor: uma degradação da Groq afeta todos os modelos
+_breaker = CircuitBreaker(
+    "groq",
+    window_size=LLM_CIRCUIT_WINDOW_SIZE,
+    min_calls=LLM_CIRCUIT_MIN_CALLS,
+    failure_rate=LLM_CIRCUIT_FAILURE_RATE,
+    slow_call_seconds=LLM_CIRCUIT_SLOW_CALL_SECONDS,
+    open_seconds=LLM_CIRCUIT_OPEN_SECONDS,
+    probe_calls=LLM_CIRCUIT_PROBE_CALLS,
+)
+
+
+class TokenBucket:
+    """
+    Balde de fichas com reposição contínua.
+
+    Começa cheio (capacity) e repõe refill_per_second fichas por segundo. O saldo
+    pode ficar negativo quando o consumo real supera o estimado.
+    """
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self._available = capacity
+        self._updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._available = min(self.capacity, self._available + (now - self._updated_at) * self.refill_per_second)
+        self._updated_at = now
+
+    def delay_for(self, amount: float) -> float:
+        """Segundos até que amount fichas estejam disponíveis (0 se já estiverem)."""
+        self._refill()
+        missing = min(amount, self.capacity) - self._available
+        return max(missing / self.refill_per_second, 0.0)
+
+    def consume(self, amount: float):
+        self._refill()
+        self._available -= amount
+
+
+class LLMScheduler:
+    """
+    Escalonador das chamadas a um modelo do provedor.
+
+    Controla, para todas as requisições da aplicação:
+        - Requisições por minuto e tokens por minuto (baldes de fichas, com os
+          tokens de cada chamada estimados a partir do prompt)
+        - Pausa global ao receber 429, respeitando o cabeçalho retry-after
+        - Concorrência adaptativa (AIMD): aumenta aditivamente enquanto as chamadas
+          respondem dentro de LLM_LATENCY_TARGET e reduz multiplicativamente a cada
+          429 ou resposta lenta
+    """
+
+    def __init__(self, model: str):
+        self.model = model
+        self._requests = TokenBucket(LLM_REQUESTS_PER_MINUTE, LLM_REQUESTS_PER_MINUTE / 60)
+        self._tokens = TokenBucket(LLM_TOKENS_PER_MINUTE, LLM_TOKENS_PER_MINUTE / 60)
+        self._limit = float(LLM_INITIAL_CONCURRENCY)
+        self._in_flight = 0
+        self._blocked_until = 0.0
+        self._condition = asyncio.Condition()
+
+    @property
+    def concurrency_limit(self) -> int:
+        return max(int(self._limit), 1)
+
+    async def _acquire(self, tokens: int):
+        """Aguarda uma vaga de concorrência e fichas suficientes nos dois baldes."""
+        started_at = time.monotonic()
+        async with self._condition:
+            while True:
+                now = time.monotonic()
+                wait = self._blocked_until - now
+                if wait <= 0 and self._in_flight < self.concurrency_limit:
+                    wait = max(self._requests.delay_for(1), self._tokens.delay_for(tokens))
+                    if wait <= 0:
+                        self._requests.consume(1)
+                        self._tokens.consume(tokens)
+                        self._in_flight += 1
+                        break
+
+                if wait <= 0:
+                    # Sem vaga de concorrência: aguarda a liberação de uma chamada
+                    await self._condition.wait()
+                else:
+                    with contextlib.suppress(asyncio.TimeoutError):
+                        await asyncio.wait_for(self._condition.wait(), timeout=wait)
+
+        metrics_service.observe("llm_scheduler_wait_seconds", time.monotonic() - started_at, WAIT_BUCKETS)
+
+    async def _release(self):
+        async with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def _on_success(self, latency: float):
+        if latency > LLM_LATENCY_TARGET:
+            self._decrease(0.9, f"latência de {latency:.1f}s")
+        else:
+            self._limit = min(self._limit + 1 / self._limit, LLM_MAX_CONCURRENCY)
+
+    def _on_rate_limited(self, retry_after: Optional[float]):
+        metrics_service.increment("llm_rate_limited")
+        delay = retry_after if retry_after is not None else LLM_RATE_LIMIT_BACKOFF
+        now = time.monotonic()
+        # 429s de chamadas que já estavam em andamento durante a pausa reduzem a concorrência uma única vez
+        if now >= self._blocked_until:
+            self._decrease(0.5, f"429, pausa de {delay:.1f}s")
+        self._blocked_until = max(self._blocked_until, now + delay)
+
+    def _decrease(self, factor: float, reason: str):
+        previous = self.concurrency_limit
+        self._limit = max(self._limit * factor, LLM_MIN_CONCURRENCY)
+        if self.concurrency_limit < previous:
+            logger.warning(f"🚦 Concorrência do modelo {self.model} reduzida para {self.concurrency_limit} ({reason})")
+
+    async def create(self, **kwargs) -> Any:
+        """
+        Executa uma chamada chat.completions.create respeitando os limites do provedor.
+
+        Recebe os mesmos argumentos da API. Exceções do provedor são propagadas
+        para as retentativas de quem chamou.
+        """
+        # Com o circuito aberto, a chamada é recusada antes de entrar na fila
+        probe = _breaker.before_call()
+        try:
+            estimated = _estimate_request_tokens(kwargs.get("messages", []), kwargs.get("max_tokens"))
+            await self._acquire(estimated)
+        except BaseException:
+            _breaker.record(None, 0.0, probe)
+            raise
+        metrics_service.increment("llm_scheduler_requests")
+
+        started_at = time.monotonic()
+        try:
+            response = await get_llm_client().chat.completions.create(**kwargs)
+        except BaseException as e:
+            if getattr(e, "status_code", None) == 429:
+                self._on_rate_limited(_retry_after(e))
+            # Erros que não indicam degradação do provedor são neutros para o circuit breaker
+            _breaker.record(False if _is_provider_failure(e) else None, time.monotonic() - started_at, probe)
+            raise
+        finally:
+            await self._release()
+
+        latency = time.monotonic() - started_at
+        _breaker.record(True, latency, probe)
+        self._on_success(latency)
+
+        # Corrige o balde de tokens com o consumo real informado pela API
+        usage = getattr(response, "usage", None)
+        total_tokens = getattr(usage, "total_tokens", None)
+        if isinstance(total_tokens, int):
+            self._tokens.consume(total_tokens - estimated)
+        return response
+
+
+def _estimate_request_tokens(messages: list[dict], max_tokens: Optional[int]) -> int:
+    """Estimativa dos tokens da chamada: prompt (texto e imagens) mais a resposta esperada."""
+    tokens = 0
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, str):
+            tokens += estimate_tokens(content)
+            continue
+        for part in content or []:
+            if part.get("type") == "text":
+                tokens += estimate_tokens(part.get("text", ""))
+            else:
+                tokens += LLM_IMAGE_TOKENS_ESTIMATE
+    return tokens + (max_tokens or LLM_OUTPUT_TOKENS_ESTIMATE)
+
+
+def _is_provider_failure(error: BaseException) -> bool:
+    """
+    Classifica um erro para o circuit breaker.
+
+    Erros 5xx, timeouts e falhas de conexão indicam degradação do provedor. 429 é
+    tratado pelo escalonador, e os demais erros 4xx e cancelamentos não dizem nada
+    sobre a saúde do provedor.
+    """
+    if not isinstance(error, Exception):
+        return False
+    status_code = getattr(error, "status_code", None)
+    return not (isinstance(status_code, int) and status_code < 500 and status_code != 408)
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Segundos indicados no cabeçalho retry-after de uma resposta 429, se houver."""
+    response = getattr(error, "response", None)
+    value = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+_schedulers: dict[str, LLMScheduler] = {}
+
+
+def get_scheduler(model: str) -> LLMScheduler:
+    """Retorna o escalonador compartilhado do modelo (os limites do provedor são por modelo)."""
+    scheduler = _schedulers.get(model)
+    if scheduler is None:
+        scheduler = _schedulers[model] = LLMScheduler(model)
+    return scheduler
+
+
+async def create_chat_completion(**kwargs) -> Any:
+    """
+    Ponto único de chamada ao provedor: encaminha a chamada ao escalonador do modelo.
+
+    Uso: await create_chat_completion(model=..., messages=..., ...), com os mesmos
+    argumentos de chat.completions.create.
+    """
+    return await get_scheduler(kwargs["model"]).create(**kwargs)
+
+
+def provider_available() -> bool:
+    """False enquanto o circuit breaker do provedor estiver aberto (chamadas falham imediatamente)."""
+    return not _breaker.is_open()
+
+
+def circuit_state() -> str:
+    """Estado atual do circuit breaker do provedor (closed, open ou half_open)."""
+    return _breaker.state
@@ -1,16 +1,26 @@
-import os
-import time
-from groq import Groq
+import asyncio
+import json
+import re
 from pydantic import BaseModel, Field
 import logging
+from typing import Awaitable, Callable, TypeVar
+
+from . import metrics_service
+from .circuit_breaker import CircuitOpenError
+from .llm_scheduler import create_chat_completion, provider_available
+from .prompt_templates import PROMPT_VERSION, build_analysis_messages, build_score_messages
+from ..config.constants import (
+    QUERY_CACHE_MAX_ITEMS, QUERY_CACHE_TTL, LLM_JSON_MODE, LLM_SCORE_MAX_TOKENS,
+    LLM_CACHE_MEMORY_ITEMS, LLM_CACHE_DIR, LLM_CACHE_DISK_MAX_BYTES, LLM_CACHE_MAX_AGE
+)
+from ..utils.cache import DiskCache, LRUCache, TieredCache, hash_bytes
 
 logger = logging.getLogger(__name__)
 
-client = Groq(
-    api_key=os.getenv("GROQ_API_KEY"),
-)
-
 MAX_RETRIES = 3
+ANALYSIS_MODEL = "llama3-8b-8192"
+
+T = TypeVar("T")
 
 class AnalysisResponse(BaseModel):
     score: float = Field(..., ge=0.0, le=10.0, description="Pontuação de 0.0 a 10.0")
@@ -20,10 +30,162 @@ class AnalysisResponseNoQuery(BaseModel):
     score: str = Field(..., description="Senioridade do candidato")
     summary: str = Field(..., description="Resumo da análise")
 
+class ScoreResponse(BaseModel):
+    score: float = Field(..., ge=0.0, le=10.0, description="Pontuação de 0.0 a 10.0 (fase 1 do ranqueamento)")
+
 class AnalysisError(BaseModel):
     error: str = Field(..., description="Mensagem de erro")
+    rejected: bool = Field(False, description="Indica que o documento foi rejeitado por não ser um currículo (validação combinada)")
+    unavailable: bool = Field(False, description="Indica que o provedor está indisponível (circuit breaker aberto)")
+
+_JSON_OBJECT_RE = re.compile(r"\{.*\}", re.DOTALL)
+_RESUME_VERDICT_RE = re.compile(r"^\s*\"?curr[ií]culo\"?\s*:\s*\"?(true|false)", re.IGNORECASE | re.MULTILINE)
+_SCORE_RE = re.compile(r"^\s*\"?score\"?\s*:\s*(.+?)\s*,?$", re.IGNORECASE | re.MULTILINE)
+_SUMMARY_RE = re.compile(r"^\s*\"?(?:resumo|summary)\"?\s*:\s*(.+?)\s*,?$", re.IGNORECASE | re.MULTILINE)
 
-def get_llm_analysis(resume_text: str, query: str = None) -> AnalysisResponse | AnalysisError:
+def _load_json_object(response: str) -> dict | None:
+    """Carrega o objeto JSON da resposta, tolerando texto ao redor (ex.: blocos de código)."""
+    for candidate in (response, *_JSON_OBJECT_RE.findall(response)):
+        try:
+            data = json.loads(candidate)
+        except ValueError:
+            continue
+        if isinstance(data, dict):
+            return {str(key).lower(): value for key, value in data.items()}
+    return None
+
+def _parse_text_fields(response: str) -> dict:
+    """Parser tolerante para respostas fora do formato JSON (linhas "Score: ..." e "Resumo: ...")."""
+    response = response.replace("*", "")
+    fields = {}
+    verdict = _RESUME_VERDICT_RE.search(response)
+    if verdict:
+        fields["curriculo"] = verdict.group(1)
+    score = _SCORE_RE.search(response)
+    if score:
+        fields["score"] = score.group(1).strip('"')
+    summary = _SUMMARY_RE.search(response)
+    if summary:
+        fields["summary"] = summary.group(1).strip('"')
+    return fields
+
+def _as_bool(value) -> bool | None:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.strip().lower() in ("true", "false"):
+        return value.strip().lower() == "true"
+    return None
+
+def _load_fields(response: str) -> dict:
+    """Campos da resposta: objeto JSON ou, se não houver, o parser tolerante de texto."""
+    fields = _load_json_object(response)
+    if fields is None:
+        fields = _parse_text_fields(response)
+        metrics_service.increment("llm_analysis_fallback_parses")
+    return fields
+
+def _is_resume(fields: dict) -> bool:
+    """No modo combinado, o veredito de currículo vem na mesma resposta da análise."""
+    is_resume = _as_bool(fields.get("curriculo", fields.get("currículo")))
+    if is_resume is None:
+        raise ValueError("Veredito de currículo ausente")
+    return is_resume
+
+def _parse_score(response: str, validate_resume: bool) -> ScoreResponse | AnalysisError:
+    """Converte a resposta da fase 1 do ranqueamento. Lança ValueError se o score estiver ausente ou inválido."""
+    fields = _load_fields(response)
+    if validate_resume and not _is_resume(fields):
+        return AnalysisError(error="Documento rejeitado, não é um currículo", rejected=True)
+
+    score = fields.get("score")
+    if isinstance(score, str):
+        score = score.split("/")[0].strip().replace(",", ".")
+    if score is None:
+        raise ValueError("Score ausente")
+    return ScoreResponse(score=float(score))
+
+def _parse_analysis(
+    response: str,
+    query: str | None,
+    validate_resume: bool,
+) -> AnalysisResponse | AnalysisResponseNoQuery | AnalysisError:
+    """
+    Converte a resposta do LLM no modelo de análise.
+
+    Tenta primeiro o JSON (resposta inteira ou objeto embutido no texto) e, se
+    não houver JSON válido, o parser tolerante de texto. Lança ValueError se os
+    campos obrigatórios estiverem ausentes ou inválidos.
+    """
+    fields = _load_fields(response)
+    if validate_resume and not _is_resume(fields):
+        return AnalysisError(error="Documento rejeitado, não é um currículo", rejected=True)
+
+    score = fields.get("score")
+    summary = fields.get("summary", fields.get("resumo"))
+    if score is None or not isinstance(summary, str) or len(summary.strip()) < 10:
+        raise ValueError("Score ou resumo ausente")
+
+    if not query:
+        return AnalysisResponseNoQuery(score=str(score).strip(), summary=summary.strip())
+
+    if isinstance(score, str):
+        score = score.split("/")[0].strip().replace(",", ".")
+    return AnalysisResponse(score=float(score), summary=summary.strip())
+
+# Resultados de análises bem-sucedidas, compartilhados entre requisições
+_analysis_cache = TieredCache(
+    memory=LRUCache(max_items=LLM_CACHE_MEMORY_ITEMS, ttl_seconds=LLM_CACHE_MAX_AGE),
+    disk=DiskCache(LLM_CACHE_DIR, max_bytes=LLM_CACHE_DISK_MAX_BYTES, max_age_seconds=LLM_CACHE_MAX_AGE),
+)
+
+def _analysis_cache_key(kind: str, resume_text: str, query: str | None, requirements: str | None, score: float | None = None) -> str:
+    """
+    Chave do cache de análises.
+
+    Combina o hash do texto normalizado do currículo, o hash da query normalizada,
+    o hash dos requisitos extraídos (se houver), o modelo e a versão do prompt. A validação combinada não entra na chave: uma
+    análise bem-sucedida do mesmo texto vale com ou sem ela.
+    """
+    parts = {
+        "kind": kind,
+        "model": ANALYSIS_MODEL,
+        "prompt_version": PROMPT_VERSION,
+        "resume": hash_bytes(" ".join(resume_text.split()).encode()),
+        "query": hash_bytes(_normalize_query(query).encode()) if query else None,
+        # Prompts com os requisitos extraídos e com a query completa geram análises diferentes,
+        # e requisitos diferentes para a mesma query também
+        "requirements": hash_bytes(requirements.encode()) if requirements else None,
+        "score": score,
+    }
+    return hash_bytes(json.dumps(parts, sort_keys=True).encode())
+
+async def _cached_analysis(key: str, model: type[T], request: Callable[[], Awaitable[T | AnalysisError]], use_cache: bool) -> T | AnalysisError:
+    """
+    Retorna a análise do cache ou executa request e armazena o resultado.
+
+    Apenas resultados bem-sucedidos são armazenados. Com use_cache=False a leitura
+    é ignorada, mas o novo resultado substitui o registro existente.
+    """
+    if use_cache:
+        entry = await _analysis_cache.get_async(key)
+        if entry is not None:
+            metrics_service.increment("llm_analysis_cache_hits")
+            return model(**entry)
+        metrics_service.increment("llm_analysis_cache_misses")
+
+    result = await request()
+    if isinstance(result, model):
+        await _analysis_cache.set_async(key, result.model_dump())
+    return result
+
+async def get_llm_analysis(
+    resume_text: str,
+    query: str = None,
+    validate_resume: bool = False,
+    requirements: str | None = None,
+    score: float | None = None,
+    use_cache: bool = True,
+) -> AnalysisResponse | AnalysisResponseNoQuery | AnalysisError:
     """
     Envia o texto de um currículo para o LLM da Groq para obter uma análise detalhada e uma pontuação.
     Se query for fornecida, analisa em relação à vaga. Caso contrário, faz um resumo geral.
@@ -31,140 +193,241 @@ def get_llm_analysis(resume_text: str, query: str = None) -> AnalysisResponse |
     Parâmetros:
         resume_text: texto do currículo
         query: texto da vaga (opcional)
+        validate_resume: modo combinado; a mesma resposta também informa se o texto é um currículo
+        requirements: requisitos já extraídos da query por extract_requirements (opcional);
+            quando informados, substituem a query e a etapa de interpretação no prompt
+        score: pontuação já obtida com get_llm_score (fase 2 do ranqueamento); o resumo
+            explica essa pontuação, que é mantida no resultado
+        use_cache: se False, ignora o cache de análises (o resultado novo é armazenado)
 
     Retorna:
-        feedback: dicionário com score e summary
+        feedback: dicionário com score e summary, ou AnalysisError com rejected=True
+        se o modelo indicar que o texto não é um currículo
     """
     
-    system_prompt = "Você é um recrutador técnico sênior e especialista em análise de currículos."
-    
-    if query:
-        # Modo análise com vaga específica
-        user_prompt = f"""
-        Você é um Analista de Talentos de IA altamente especializado. Sua função é realizar uma análise técnica e detalhada de um único currículo em relação a uma requisição de vaga ou perfil profissional.
-        
-        Você deve avaliar o alinhamento de um candidato (representado por seu currículo) com uma requisição específica, gerando uma pontuação (score), uma análise detalhada e observações pertinentes. Sua análise deve ser objetiva e estritamente baseada nos dados fornecidos.
-        
-        Metodologia de Análise (Passo a Passo):
-            1. **Interpretar a Requisição:**
-                * **Se a requisição for detalhada (descrição de vaga):** Identifique e liste todos os requisitos-chave: tecnologias, frameworks, linguagens, anos de experiência, certificações e outras competências.
-                * **Se a requisição for simples ou genérica (ex: "Backend", "Frontend Pleno", "Analista de Dados"):** Infira os requisitos essenciais para esse perfil.
-                    * *Exemplo para "Backend":* Você deve procurar por linguagens (Java, Python, C#, Node.js), bancos de dados (SQL, NoSQL), conhecimento em APIs (REST, GraphQL), arquitetura de sistemas (microsserviços) e cloud (AWS, Azure, GCP).
-                    * *Exemplo para "Qual o melhor candidato para a vaga de devops":* Trate isso como uma requisição por um perfil "DevOps" ideal e analise o currículo em relação a esse perfil (ferramentas de CI/CD, IaC como Terraform, contêineres como Docker/Kubernetes, scripting).
+    async def request() -> AnalysisResponse | AnalysisResponseNoQuery | AnalysisError:
+        # Prefixo idêntico para todos os currículos do lote (instruções + query), currículo no final
+        messages = build_analysis_messages(resume_text, query, requirements, validate_resume, score)
+
+        analysis = await _request_analysis(messages, lambda content: _parse_analysis(content, query, validate_resume))
+        if score is not None and isinstance(analysis, AnalysisResponse):
+            analysis.score = score
+        return analysis
+
+    key = _analysis_cache_key("analysis", resume_text, query, requirements, score)
+    model = AnalysisResponse if query else AnalysisResponseNoQuery
+    return await _cached_analysis(key, model, request, use_cache)
+
+async def get_llm_score(
+    resume_text: str,
+    query: str,
+    validate_resume: bool = False,
+    requirements: str | None = None,
+    use_cache: bool = True,
+) -> ScoreResponse | AnalysisError:
+    """
+    Fase 1 do ranqueamento: obtém apenas a pontuação do currículo em relação à vaga.
 
-            2.  **Analisar o Currículo:** Examine o texto completo do currículo para encontrar evidências diretas e indiretas que correspondam aos requisitos identificados no passo 1. Preste atenção especial aos anos de experiência com cada tecnologia e ao contexto dos projetos descritos.
+    A resposta é limitada a LLM_SCORE_MAX_TOKENS tokens; o resumo detalhado é gerado
+    depois com get_llm_analysis, apenas para os currículos que entram no resultado final.
 
-            3.  **Gerar a Análise:** Com base na comparação, construa o feedback. A pontuação deve refletir o alinhamento geral, e o resumo deve explicar o porquê dessa pontuação, detalhando os pontos fortes e as lacunas do candidato.
+    Parâmetros:
+        resume_text: texto do currículo
+        query: texto da vaga
+        validate_resume: modo combinado; a mesma resposta também informa se o texto é um currículo
+        requirements: requisitos já extraídos da query por extract_requirements (opcional)
+        use_cache: se False, ignora o cache de análises (o resultado novo é armazenado)
+    """
+    async def request() -> ScoreResponse | AnalysisError:
+        messages = build_score_messages(resume_text, query, requirements, validate_resume)
+        return await _request_analysis(
+            messages,
+            lambda content: _parse_score(content, validate_resume),
+            max_tokens=LLM_SCORE_MAX_TOKENS,
+        )
 
-        Critérios de Pontuação (Score):
-            * **8.0 - 10.0 (Alinhamento Forte):** O candidato atende a todos ou quase todos os requisitos essenciais da requisição. A experiência e as habilidades descritas são altamente relevantes.
-            * **6.0 - 7.9 (Alinhamento Bom):** O candidato atende à maioria dos requisitos importantes, mas possui algumas lacunas em tecnologias secundárias ou no tempo de experiência. É um candidato promissor.
-            * **4.0 - 5.9 (Alinhamento Razoável):** O candidato possui algumas das habilidades requeridas, mas falta conhecimento em pontos cruciais da requisição. Pode ser considerado para vagas de menor senioridade ou com treinamento.
-            * **0.0 - 3.9 (Alinhamento Baixo):** O candidato atende a poucos ou nenhum dos requisitos essenciais. O perfil não é compatível com a requisição.
+    key = _analysis_cache_key("score", resume_text, query, requirements)
+    return await _cached_analysis(key, ScoreResponse, request, use_cache)
 
-        Formato da Saída:
-        A sua resposta deve seguir extritamente a estrutura abaixo:
-        
-            Feedback:
-                Score: (float, de 0.0 a 10.0). O quanto o candidato está alinhado com a requisição.
-                Resumo: (string). Um resumo detalhado sobre a adequação do candidato. Considerar as tecnologias, frameworks, linguagens de programação, etc. da requisição e como o candidato se alinha com elas. Inclua informações sobre anos de experiência, projetos relevantes, habilidades técnicas e outras competências que sejam pertinentes à requisição. Aqui você deve explicar os pontos fortes e fracos do candidato, deixando claro o que faltou para que o candidato fosse considerado ideal para a requisição.
-            
-            Extra_comments:
-                Insira aqui qualquer extra_comment que você quiser adicionar sobre o currículo.
-
-        ---
-        DESCRIÇÃO DA REQUISIÇÃO:
-        "{query}"
-        ---
-        TEXTO DO CURRÍCULO:
-        "{resume_text}"
-        ---
-
-        Lembre-se, siga a estrutura de feedback, com score e resumo, e extra_comments. Tenha em mente que caso mude essa estrutura iremos encontrar erros e o resumo não será aceito.
-        """
-
-    else:
-        # Modo resumo geral do currículo
-        user_prompt = f"""
-        Faça um resumo analítico do currículo fornecido.
-        Sua resposta deve seguir a seguinte estrutura:
-
-        Feedback:
-            Score: (string, senioridade do candidato, pode ser júnior, pleno ou sênior)
-            Resumo: (string, um resumo detalhado sobre o perfil profissional, experiências relevantes, competências técnicas e nível de senioridade do candidato)
-        
-        Extra comments:
-            Insira aqui qualquer extra_comment sobre pontos fortes, áreas de especialização ou observações relevantes do currículo.
-
-        ---
-        TEXTO DO CURRÍCULO:
-        "{resume_text}"
-        ---
+async def _request_analysis(messages: list[dict], parse: Callable[[str], T], max_tokens: int | None = None) -> T | AnalysisError:
+    """Chama o modelo de análise com retentativas, convertendo a resposta com parse."""
 
-        Lembre-se, siga a estrutura de feedback, com score e resumo, e extra_comments. Tenha em mente que caso mude essa estrutura iremos encontrar erros e o resumo não será aceito.
-        """
+    # Com LLM_JSON_MODE, a API restringe a resposta a um objeto JSON
+    response_options = {"response_format": {"type": "json_object"}} if LLM_JSON_MODE else {}
+    if max_tokens is not None:
+        response_options["max_tokens"] = max_tokens
 
     for i in range(MAX_RETRIES):
+        if i > 0:
+            metrics_service.increment("llm_analysis_retries")
+            await asyncio.sleep(0.5 * i)
+        metrics_service.increment("llm_analysis_requests")
+
         try:
-            response = client.chat.completions.create(
-                model="llama3-8b-8192",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
+            response = await create_chat_completion(
+                model=ANALYSIS_MODEL,
+                messages=messages,
                 temperature=0.2,
+                **response_options,
             )
-
-            res = response.choices[0].message.content
-            
-            # Normalização da resposta
-            res = res.replace("*", "")
-            extra_comments = "Extra_comments" if "Extra_comments" in res else "Extra comments"
-            feedback = "Feedback" if "Feedback" in res else "feedback"
-            score = "Score" if "Score" in res else "score"
-            resumo = "Resumo" if "Resumo" in res else "resumo"
-
-            analysis_json = res.split(feedback)[1].split(extra_comments)[0].strip()
-            score = analysis_json.split(score)[1].split("\n")[0].strip()
-            summary = analysis_json.split(resumo)[1].split("\n")[0].strip()
-
-            if len(summary) < 10:
-                continue  # Resumo muito curto, tentar novamente
-
-            if "/" in score:
-                score = score.split("/")[0].strip()
-
-            # Se começar com : remove
-            if score.startswith(":"):
-                score = score[1:].strip()
-            if summary.startswith(":"):
-                summary = summary[1:].strip()
-
-            # Converte score para float
-            if query:
-                data = AnalysisResponse(score=float(score), summary=summary)
-            else:
-                data = AnalysisResponseNoQuery(score=score, summary=summary)
-
-            return data
+        except CircuitOpenError as e:
+            # Provedor indisponível: falha imediata, sem retentativas
+            logger.warning(f"⚠️ Análise de currículo não executada: {e}")
+            return AnalysisError(error=str(e), unavailable=True)
         except Exception as e:
+            metrics_service.increment("llm_analysis_api_errors")
             logger.warning(f"⚠️ Tentativa {i+1}/{MAX_RETRIES} falhou para Groq API - análise de currículo: {str(e)[:100]}...")
             if i == MAX_RETRIES - 1:
                 logger.error(f"❌ Todas as tentativas falharam para Groq API - análise de currículo. Último erro: {e}")
             continue
+
+        try:
+            return parse(response.choices[0].message.content or "")
+        except (ValueError, TypeError) as e:
+            metrics_service.increment("llm_analysis_parse_failures")
+            logger.warning(f"⚠️ Tentativa {i+1}/{MAX_RETRIES} - resposta da análise de currículo fora do formato: {str(e)[:100]}...")
+            continue
         
-    return AnalysisError(error=f"Erro ao processar o currículo, tente novamente mais tarde.")
+    # Se as falhas abriram o circuito do provedor, o arquivo segue no modo degradado
+    return AnalysisError(error=f"Erro ao processar o currículo, tente novamente mais tarde.", unavailable=not provider_available())
+
+# Vereditos de validação de queries, chaveados pelo texto normalizado da query
+_query_cache = LRUCache(max_items=QUERY_CACHE_MAX_ITEMS, ttl_seconds=QUERY_CACHE_TTL)
+# Validações em andamento, compartilhadas por requisições simultâneas com a mesma query
+_pending_queries: dict[str, asyncio.Task] = {}
+
+def _normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+async def _cached_query_call(
+    cache: LRUCache,
+    pending: dict[str, asyncio.Task],
+    query: str,
+    request: Callable[[str], Awaitable[T | None]],
+) -> T | None:
+    """
+    Executa uma chamada ao LLM derivada da query, com cache pelo texto normalizado.
 
-def validate_query(query: str) -> bool:
+    Requisições simultâneas com a mesma query compartilham a mesma chamada em
+    andamento. Resultados None (nenhuma tentativa bem-sucedida) não são armazenados.
+    """
+    key = _normalize_query(query)
+    result = cache.get(key)
+    if result is not None:
+        logger.debug(f"⚡ Resultado de {request.__name__} obtido do cache")
+        return result
+
+    task = pending.get(key)
+    if task is None:
+        task = asyncio.create_task(request(query))
+        pending[key] = task
+        task.add_done_callback(lambda _: pending.pop(key, None))
+
+    result = await asyncio.shield(task)
+    if result is not None:
+        cache.set(key, result)
+    return result
+
+async def validate_query(query: str) -> bool:
     """
     Valida a query para garantir que ela seja adequada para análise.
 
+    Os vereditos são armazenados em cache (LRU com TTL) pelo texto normalizado
+    da query, e requisições simultâneas com a mesma query compartilham a mesma
+    chamada ao LLM.
+
     Parâmetros:
         query: string a ser validada
 
     Retorna:
         bool: True se a query for válida, False caso contrário
+
+    Lança:
+        CircuitOpenError: se o provedor estiver indisponível
+    """
+    verdict = await _cached_query_call(_query_cache, _pending_queries, query, _request_query_verdict)
+    return bool(verdict)
+
+# Requisitos extraídos das queries, chaveados pelo texto normalizado da query
+_requirements_cache = LRUCache(max_items=QUERY_CACHE_MAX_ITEMS, ttl_seconds=QUERY_CACHE_TTL)
+_pending_requirements: dict[str, asyncio.Task] = {}
+
+async def extract_requirements(query: str) -> str | None:
+    """
+    Resume a query em uma lista compacta de requisitos, usada nos prompts de todos os currículos.
+
+    A extração é feita uma vez por query distinta (com cache, como validate_query),
+    em vez de o modelo interpretar a requisição novamente para cada currículo.
+
+    Retorna:
+        Lista de requisitos (uma linha por requisito), ou None se a extração falhar.
     """
+    return await _cached_query_call(_requirements_cache, _pending_requirements, query, _request_requirements)
+
+async def _request_requirements(query: str) -> str | None:
+    """Consulta o LLM para extrair os requisitos da query. Retorna None se nenhuma tentativa for bem-sucedida."""
+
+    system_prompt = "Você é um recrutador técnico sênior e especialista em análise de vagas."
+
+    user_prompt = f"""
+    Extraia os requisitos da requisição de vaga abaixo, que serão usados para avaliar currículos.
+
+    - **Se a requisição for detalhada (descrição de vaga):** Liste todos os requisitos-chave: tecnologias, frameworks, linguagens, anos de experiência, certificações e outras competências.
+    - **Se a requisição for simples ou genérica (ex: "Backend", "Frontend Pleno", "Analista de Dados", "Qual o melhor candidato para a vaga de devops"):** Infira os requisitos essenciais para esse perfil profissional ideal.
+
+    Cada requisito deve ser curto (no máximo uma linha) e indicar se é essencial ou desejável.
+
+    A sua resposta deve ser APENAS um objeto JSON válido, com a estrutura:
+    {{
+        "profile": (string) o perfil profissional buscado, em uma linha,
+        "requirements": (lista de strings) os requisitos, dos mais importantes para os menos importantes
+    }}
+
+    ---
+    REQUISIÇÃO:
+    "{query}"
+    ---
+    """
+
+    response_options = {"response_format": {"type": "json_object"}} if LLM_JSON_MODE else {}
+
+    for i in range(MAX_RETRIES):
+        if i > 0:
+            await asyncio.sleep(0.5 * i)
+
+        try:
+            response = await create_chat_completion(
+                model="llama3-8b-8192",
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                temperature=0.0,
+                **response_options,
+            )
+        except CircuitOpenError as e:
+            logger.warning(f"⚠️ Extração de requisitos não executada: {e}")
+            return None
+        except Exception as e:
+            logger.warning(f"⚠️ Tentativa {i+1}/{MAX_RETRIES} falhou para Groq API - extração de requisitos: {str(e)[:100]}...")
+            continue
+
+        data = _load_json_object(response.choices[0].message.content or "")
+        requirements = data.get("requirements") if data else None
+        if not isinstance(requirements, list) or not requirements:
+            logger.warning(f"⚠️ Tentativa {i+1}/{MAX_RETRIES} - resposta da extração de requisitos fora do formato")
+            continue
+
+        lines = [f"Perfil: {data['profile']}"] if isinstance(data.get("profile"), str) else []
+        lines += [f"- {str(requirement).strip()}" for requirement in requirements if str(requirement).strip()]
+        logger.debug(f"📋 Requisitos extraídos da query: {len(requirements)}")
+        return "\n".join(lines)
+
+    logger.error("❌ Falha na extração de requisitos da query, usando a query completa nas análises")
+    return None
+
+async def _request_query_verdict(query: str) -> bool | None:
+    """Consulta o LLM sobre a validade da query. Retorna None se nenhuma tentativa produzir um veredito."""
 
     system_prompt = f"""
     Você é um Validador de Requisições para um sistema de Recrutamento e Seleção. Sua única função é analisar uma requisição (query) e determinar se ela é apropriada para o contexto de análise e triagem de currículos.
@@ -204,10 +467,12 @@ def validate_query(query: str) -> bool:
 
     for i in range(MAX_RETRIES):
 
-        time.sleep(0.5 * (i + 1))  # Atraso exponencial para evitar sobrecarga
+        # Atraso exponencial entre tentativas para evitar sobrecarga (a primeira tentativa é imediata)
+        if i > 0:
+            await asyncio.sleep(0.5 * i)
         
         try:
-            response = client.chat.completions.create(
+            response = await create_chat_completion(
                 model="llama3-8b-8192",
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -227,10 +492,13 @@ def validate_query(query: str) -> bool:
             elif "false" in res.lower():
                 return False            
 
+        except CircuitOpenError:
+            # Sem veredito possível: quem chamou decide como seguir com o provedor indisponível
+            raise
         except Exception as e:
             logger.warning(f"⚠️ Tentativa {i+1}/{MAX_RETRIES} falhou para Groq API - validação de query: {str(e)[:100]}...")
             if i == MAX_RETRIES - 1:
                 logger.error(f"❌ Todas as tentativas falharam para Groq API - validação de query. Último erro: {e}")
             continue
 
-    return False  
\ No newline at end of file
+    return None
@@ -0,0 +1,67 @@
+import threading
+from collections import defaultdict
+from typing import Sequence
+
+# Limites superiores padrão dos buckets de histogramas de confiança (0 a 100)
+CONFIDENCE_BUCKETS = (10, 20, 30, 40, 50, 60, 70, 80, 90, 100)
+
+_lock = threading.Lock()
+_counters: dict[str, float] = defaultdict(float)
+_histograms: dict[str, dict] = {}
+
+
+def increment(name: str, value: float = 1):
+    """Incrementa um contador."""
+    with _lock:
+        _counters[name] += value
+
+
+def observe(name: str, value: float, buckets: Sequence[float] = CONFIDENCE_BUCKETS):
+    """
+    Registra uma observação em um histograma.
+
+    Os buckets são definidos na primeira observação; cada bucket conta as
+    observações menores ou iguais ao seu limite e maiores que o limite anterior.
+    """
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = {
+                "buckets": list(buckets),
+                "counts": [0] * (len(buckets) + 1),
+                "count": 0,
+                "sum": 0.0,
+                "min": None,
+                "max": None,
+            }
+            _histograms[name] = histogram
+
+        index = next((i for i, limit in enumerate(histogram["buckets"]) if value <= limit), len(histogram["buckets"]))
+        histogram["counts"][index] += 1
+        histogram["count"] += 1
+        histogram["sum"] += value
+        histogram["min"] = value if histogram["min"] is None else min(histogram["min"], value)
+        histogram["max"] = value if histogram["max"] is None else max(histogram["max"], value)
+
+
+def snapshot() -> dict:
+    """Retorna uma cópia dos contadores e histogramas (com média e contagem por bucket)."""
+    with _lock:
+        histograms = {}
+        for name, histogram in _histograms.items():
+            labels = [f"<={limit}" for limit in histogram["buckets"]] + ["+inf"]
+            histograms[name] = {
+                "count": histogram["count"],
+                "mean": histogram["sum"] / histogram["count"] if histogram["count"] else None,
+                "min": histogram["min"],
+                "max": histogram["max"],
+                "buckets": dict(zip(labels, histogram["counts"])),
+            }
+        return {"counters": dict(_counters), "histograms": histograms}
+
+
+def reset():
+    """Zera todas as métricas."""
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
@@ -0,0 +1,146 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from ..config.constants import OCR_POOL_WORKERS, OCR_PAGE_PARALLELISM
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+# Núcleos ocupados no pool (tarefas em execução + threads de página extras), compartilhado
+# entre os workers. Nos workers, definido por _init_worker; None fora do pool.
+_busy_cores = None
+_worker_cores = 1
+
+
+def _available_cores() -> int:
+    """Retorna o número de núcleos disponíveis para o processo."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _init_worker(busy_cores, cores: int):
+    """
+    Inicializa um worker do pool.
+
+    Importa cv2, fitz e o engine do Tesseract uma única vez por processo e limita
+    as threads internas do OpenCV e do Tesseract, já que o paralelismo vem do
+    próprio pool. Recebe o contador de núcleos ocupados, usado para dimensionar
+    as threads de página pela capacidade ociosa.
+    """
+    global _busy_cores, _worker_cores
+    _busy_cores = busy_cores
+    _worker_cores = cores
+
+    import cv2
+    cv2.setNumThreads(1)
+
+    from . import tesseract_engine  # noqa: F401 - define OMP_THREAD_LIMIT antes de carregar a libtesseract
+    from . import ocr_service  # noqa: F401 - carrega fitz, pytesseract e dependências
+
+
+def _run_task(func: Callable[..., Any], *args: Any) -> Any:
+    """Executa uma tarefa no worker, contabilizando o núcleo ocupado."""
+    with _busy_cores.get_lock():
+        _busy_cores.value += 1
+    try:
+        return func(*args)
+    finally:
+        with _busy_cores.get_lock():
+            _busy_cores.value -= 1
+
+
+def reserve_idle_cores(wanted: int) -> int:
+    """
+    Reserva até wanted núcleos ociosos do pool para threads extras do worker atual.
+
+    Fora do pool (sem contador), concede o que foi pedido. Os núcleos reservados
+    devem ser devolvidos com release_cores.
+    """
+    if _busy_cores is None:
+        return max(wanted, 0)
+    with _busy_cores.get_lock():
+        granted = max(min(wanted, _worker_cores - _busy_cores.value), 0)
+        _busy_cores.value += granted
+    return granted
+
+
+def release_cores(count: int):
+    """Devolve os núcleos reservados por reserve_idle_cores."""
+    if _busy_cores is None or count <= 0:
+        return
+    with _busy_cores.get_lock():
+        _busy_cores.value -= count
+
+
+def _create_executor() -> ProcessPoolExecutor:
+    cores = _available_cores()
+    workers = OCR_POOL_WORKERS or cores
+    context = multiprocessing.get_context("spawn")
+    executor = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(context.Value("i", 0), cores),
+    )
+    logger.info(f"⚙️ Pool de OCR iniciado com {workers} worker(s)")
+    return executor
+
+
+def start_ocr_pool():
+    """
+    Cria o pool de processos de OCR.
+
+    Esta função deve ser chamada no startup da aplicação.
+    """
+    global _executor
+    if _executor is None:
+        _executor = _create_executor()
+
+
+def shutdown_ocr_pool():
+    """
+    Encerra o pool de processos de OCR, cancelando tarefas pendentes.
+
+    Esta função deve ser chamada no shutdown da aplicação.
+    """
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+        logger.info("🔌 Pool de OCR encerrado")
+
+
+def _restart_broken_pool(broken: ProcessPoolExecutor):
+    global _executor
+    if _executor is broken:
+        broken.shutdown(wait=False, cancel_futures=True)
+        _executor = _create_executor()
+
+
+async def run_in_pool(func: Callable[..., Any], *args: Any) -> Any:
+    """
+    Executa uma função no pool de OCR.
+
+    Se o pool não foi iniciado (ex.: uso fora da aplicação), executa em uma
+    thread do executor padrão. Se um worker morrer, o pool é recriado e o erro
+    é propagado para que o chamador decida sobre a retentativa.
+    """
+    loop = asyncio.get_running_loop()
+    executor = _executor
+    if executor is None:
+        return await loop.run_in_executor(None, func, *args)
+
+    try:
+        return await loop.run_in_executor(executor, _run_task, func, *args)
+    except BrokenProcessPool:
+        logger.error("❌ Pool de OCR corrompido (worker encerrado inesperadamente), recriando")
+        _restart_broken_pool(executor)
+        raise
@@ -1,142 +1,675 @@
-import pytesseract
+import asyncio
 import cv2
 import numpy as np
 import fitz
 import io
 import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Awaitable, Callable, Iterable, Iterator, List, TypeVar
 from pdf2image import convert_from_bytes
-from PIL import Image
+from PIL import Image, ImageOps
 from pydantic import BaseModel, Field
-from ..utils import validation_service
+from ..utils import resume_classifier, validation_service
+from . import ocr_pool
+from .ocr_pool import run_in_pool
+from .tesseract_engine import recognize
+from ..utils.cache import DiskCache, LRUCache, TieredCache
+from ..config.constants import (
+    OCR_CACHE_MEMORY_ITEMS, OCR_CACHE_DIR, OCR_CACHE_DISK_MAX_BYTES, OCR_CACHE_MAX_AGE,
+    OCR_PAGE_PARALLELISM, PDF_RASTER_BACKEND, PDF_RASTER_DPI, PDF_PAGE_MIN_TEXT_CHARS,
+    OCR_TARGET_TEXT_HEIGHT, OCR_TEXT_HEIGHT_RANGE, OCR_DPI_RANGE, OCR_MAX_UPSCALE,
+    OCR_CONFIDENCE_THRESHOLD, PDF_PAGE_VALIDATION_POLICY, PDF_PAGE_VALIDATION_PAGES,
+    VALIDATION_THUMBNAIL_MAX_SIDE, VALIDATION_THUMBNAIL_CACHE_ITEMS
+)
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 class OcrError(BaseModel):
     error: str = Field(..., description="Mensagem de erro")
+    rejected: bool = Field(False, description="Indica que o arquivo foi rejeitado por não ser um currículo")
+
+class OcrPageStats(BaseModel):
+    page: int = Field(..., description="Número da página (base 1)")
+    fast_confidence: float = Field(..., description="Confiança média do OCR no caminho rápido (0 a 100)")
+    confidence: float = Field(..., description="Confiança média do texto final (0 a 100)")
+    escalated: bool = Field(..., description="Indica se a página passou pelo preprocessamento completo")
 
 class OcrResponse(BaseModel):
     text: str = Field(..., description="Texto extraído do arquivo")
+    pages: List[OcrPageStats] = Field(default_factory=list, description="Estatísticas das páginas processadas com OCR")
+    validated: bool = Field(True, description="Indica se o texto já foi validado como currículo (False quando o classificador local ficou na faixa de incerteza)")
+    thumbnail_pages: List[int] = Field(default_factory=list, description="Páginas (base 0) para a validação visual; vazio quando a validação é feita pelo texto")
+
+_result_cache = TieredCache(
+    memory=LRUCache(max_items=OCR_CACHE_MEMORY_ITEMS),
+    disk=DiskCache(OCR_CACHE_DIR, max_bytes=OCR_CACHE_DISK_MAX_BYTES, max_age_seconds=OCR_CACHE_MAX_AGE),
+)
+# Miniaturas de validação já codificadas, chaveadas por (SHA-256 do arquivo, página)
+_thumbnail_cache = LRUCache(max_items=VALIDATION_THUMBNAIL_CACHE_ITEMS)
+
+async def get_cached_result(file_hash: str) -> OcrResponse | OcrError | None:
+    """
+    Busca no cache o resultado da extração de um arquivo já processado.
+
+    Parâmetros:
+        file_hash: SHA-256 do conteúdo do arquivo
+
+    Retorna:
+        OcrResponse com o texto validado, OcrError se o arquivo foi rejeitado
+        como não-currículo, ou None se não houver registro.
+    """
+    entry = await _result_cache.get_async(file_hash)
+    if entry is None:
+        return None
+
+    if entry.get("is_resume"):
+        return OcrResponse(text=entry["text"], validated=entry.get("validated", True))
+    return OcrError(error=entry["error"], rejected=True)
+
+async def cache_result(file_hash: str, result: OcrResponse | OcrError):
+    """
+    Armazena o texto extraído e o veredito da validação de um arquivo.
+
+    Apenas resultados definitivos são armazenados: texto extraído (validado ou
+    com a validação adiada para a análise combinada) ou rejeição por não ser um
+    currículo. Falhas transitórias (OCR, rede) não entram no cache.
+    """
+    if isinstance(result, OcrResponse):
+        await _result_cache.set_async(file_hash, {"is_resume": True, "text": result.text, "validated": result.validated})
+    elif result.rejected:
+        await _result_cache.set_async(file_hash, {"is_resume": False, "error": result.error})
 
 def extract_text_from_file(file_bytes: bytes, filename: str) -> OcrResponse | OcrError:
+    """
+    Extrai o texto de um PDF ou imagem e aplica a pré-classificação local de currículos.
+
+    Roda nos workers de OCR e não faz chamadas ao LLM: quando o classificador local
+    fica na faixa de incerteza, o resultado é devolvido com validated=False (e com as
+    páginas para a validação visual, quando for o caso) para ser validado por
+    validate_extraction no processo principal.
+    """
 
     # Se o arquivo for uma imagem, usa OCR.
     if filename.lower().endswith(('.png', '.jpg', '.jpeg')):
         try:
             logger.debug(f"🖼️ Iniciando preprocessamento de imagem: {filename}")
             
-            # Validação de imagem com IA ANTES do OCR
-            logger.debug(f"🤖 Iniciando validação de imagem com IA: {filename}")
-            validation_result = validation_service.validate_image_content(file_bytes, filename)
-            
-            if isinstance(validation_result, validation_service.ValidationError):
-                logger.warning(f"⚠️ Erro na validação da imagem {filename}: {validation_result.error}")
-                # Continue com o processamento normal se a validação falhar
-            elif not validation_result:
-                logger.warning(f"⚠️ Imagem {filename} não é um currículo")
-                return OcrError(error=f"Arquivo {filename} rejeitado, não é um currículo.")
-            else:
-                logger.debug(f"✅ Imagem validada pela IA - {filename}")
+            # Normalização e OCR adaptativo da imagem
+            image = decode_image(file_bytes)
+            text, stats = ocr_image(image, page_number=1)
             
-            # Pre processamento da imagem
-            image = preprocess_image(file_bytes)
-            text = pytesseract.image_to_string(image, lang='por+eng')
+            # Pré-classificação local do texto; a validação visual com IA só é usada na faixa de incerteza
+            verdict = resume_classifier.classify_resume_text(text)
+            if verdict is None:
+                return OcrResponse(text=text, pages=[stats], validated=False, thumbnail_pages=[0])
+            elif not verdict:
+                logger.warning(f"⚠️ Imagem {filename} não é um currículo (classificação local)")
+                return OcrError(error=f"Arquivo {filename} rejeitado, não é um currículo.", rejected=True)
             
-            return OcrResponse(text=text)
+            logger.debug(f"⚡ Imagem classificada localmente como currículo: {filename}")
+            return OcrResponse(text=text, pages=[stats])
         except Exception as e:
             return OcrError(error=f"Erro ao processar imagem {filename} com OCR: {e}")
 
-    # Se o arquivo for um PDF, tenta extrair texto diretamente.
+    # Se o arquivo for um PDF, tenta extrair texto diretamente de cada página.
     elif filename.lower().endswith('.pdf'):
-        direct_text = ""
-        try:
-            pdf_document = fitz.open(stream=file_bytes, filetype="pdf")
-            for page in pdf_document:
-                direct_text += page.get_text()
-            pdf_document.close()
-        except Exception as e:
-            logger.debug(f"🔄 Extração direta de PDF falhou, usando OCR como fallback: {str(e)[:50]}...")
-            direct_text = ""
+        page_texts, ocr_pages = _read_pdf_text_layer(file_bytes)
+        native_text = "".join(text for i, text in enumerate(page_texts) if i not in ocr_pages)
         
-        # Se o texto direto for maior que 200 caracteres, consideramos que é um PDF de texto.
-        if len(direct_text.strip()) > 200:
-            logger.debug(f"📄 PDF com texto extraído diretamente: {filename} ({len(direct_text)} chars)")
-            
-            # Validação de texto com IA
-            logger.debug(f"🤖 Iniciando validação de texto com IA: {filename}")
-            validation_result = validation_service.validate_text_content(direct_text, filename)
+        # Se todas as páginas têm texto e ele é maior que 200 caracteres, consideramos que é um PDF de texto.
+        if not ocr_pages and len(native_text.strip()) > 200:
+            logger.debug(f"📄 PDF com texto extraído diretamente: {filename} ({len(native_text)} chars)")
             
-            if isinstance(validation_result, validation_service.ValidationError):
-                logger.warning(f"⚠️ Arquivo {filename} rejeitado, não é um currículo: {validation_result.error}")
-                return OcrError(error=f"Arquivo {filename} rejeitado, não é um currículo: {validation_result.error}")
-            elif not validation_result:
-                logger.warning(f"⚠️ Arquivo {filename} rejeitado, não é um currículo")
-                return OcrError(error=f"Arquivo {filename} rejeitado, não é um currículo")
-            else:
-                logger.debug(f"✅ Currículo validado pela IA - {filename}")
+            verdict = _classify_pdf_text(native_text, filename)
+            if isinstance(verdict, OcrError):
+                return verdict
             
-            return OcrResponse(text=direct_text)
+            return OcrResponse(text=native_text, validated=verdict)
         
-        # Se o texto direto for menor que 200 caracteres, consideramos que é um PDF de imagens.
+        # Se o texto nativo for maior que 200 caracteres, mas há páginas digitalizadas, o PDF é misto:
+        # o OCR é aplicado apenas nas páginas sem texto e o documento é classificado pelo texto completo
+        # (o currículo pode estar justamente nas páginas digitalizadas).
+        elif len(native_text.strip()) > 200:
+            logger.debug(f"📑 PDF misto: {filename} ({len(page_texts) - len(ocr_pages)} página(s) com texto, {len(ocr_pages)} para OCR)")
+
+            try:
+                ocr_texts, page_stats = _ocr_pdf_pages(file_bytes, filename, ocr_pages)
+            except Exception as e:
+                return OcrError(error=f"Erro crítico no OCR das páginas digitalizadas do PDF: {e}")
+
+            text = ""
+            for i, page_text in enumerate(page_texts):
+                text += f"\n--- Página {i+1} ---\n{ocr_texts.get(i, page_text)}"
+            logger.debug(f"✅ Extração concluída para PDF misto: {filename} ({len(ocr_pages)} página(s) com OCR)")
+
+            verdict = _classify_pdf_text(text, filename)
+            if isinstance(verdict, OcrError):
+                return verdict
+            return OcrResponse(text=text, pages=page_stats, validated=verdict)
+        
+        # Se o texto nativo for menor que 200 caracteres, consideramos que é um PDF de imagens.
+        # A decisão por página continua valendo: páginas com texto nativo não passam pelo OCR
+        # (se a camada de texto não pôde ser lida, todas as páginas são processadas).
         else:
             logger.debug(f"🖼️ PDF identificado como imagem, aplicando OCR com preprocessamento: {filename}")
-            ocr_text = ""
             try:
-                pages = convert_from_bytes(file_bytes)
-                logger.debug(f"📄 Convertendo {len(pages)} páginas do PDF para imagens")
-                
-                # Validação da primeira página como imagem
-                if len(pages) > 0:
-                    first_page = pages[0]
-                    img_buffer = io.BytesIO()
-                    first_page.save(img_buffer, format='PNG')
-                    img_bytes = img_buffer.getvalue()
-                    
-                for i, page_image in enumerate(pages):
-                    # Converte a PIL Image para bytes para usar o preprocessamento
-                    img_buffer = io.BytesIO()
-                    page_image.save(img_buffer, format='PNG')
-                    img_bytes = img_buffer.getvalue()
-                    
-                    # Validação da página com IA
-                    logger.debug(f"🤖 Iniciando validação da página {i+1}/{len(pages)} com IA: {filename}")
-                    validation_result = validation_service.validate_image_content(img_bytes, filename)
-                    
-                    # Se a página não for um currículo, para o loop
-                    if isinstance(validation_result, validation_service.ValidationError):
-                        logger.warning(f"⚠️ Erro na validação da página {i+1}/{len(pages)} - {filename}: {validation_result.error}")
-                        return OcrError(error=f"Erro na validação da página {i+1}/{len(pages)} - {filename}: {validation_result.error}")
-                    elif not validation_result:
-                        logger.warning(f"⚠️ PDF {filename} não é um currículo")
-                        return OcrError(error=f"Arquivo {filename} rejeitado, não é um currículo")
-                    
-                    # Aplica o mesmo preprocessamento usado para imagens diretas
-                    logger.debug(f"🔧 Aplicando preprocessamento na página {i+1}/{len(pages)}")
-                    processed_image = preprocess_image(img_bytes)
-
-                    text = pytesseract.image_to_string(processed_image, lang='por+eng')
-                    ocr_text += f"\n--- Página {i+1} ---\n{text}"
+                if not page_texts:
+                    ocr_texts, page_stats = _ocr_pdf_pages(file_bytes, filename)
+                elif ocr_pages:
+                    ocr_texts, page_stats = _ocr_pdf_pages(file_bytes, filename, ocr_pages)
+                else:
+                    ocr_texts, page_stats = {}, []
+
+                texts = dict(enumerate(page_texts))
+                texts.update(ocr_texts)
+                ocr_text = ""
+                for i, page_text in sorted(texts.items()):
+                    ocr_text += f"\n--- Página {i+1} ---\n{page_text}"
                 
                 if not ocr_text.strip():
                     return OcrError(error="Alerta: O PDF parece ser uma imagem, mas o OCR não conseguiu extrair texto.")
-                logger.debug(f"✅ OCR concluído para PDF: {filename} ({len(pages)} páginas processadas)")
-                return OcrResponse(text=ocr_text)
+
+                # Pré-classificação local do texto; a validação visual das páginas só é usada na faixa de incerteza
+                verdict = resume_classifier.classify_resume_text(ocr_text)
+                if verdict is False:
+                    logger.warning(f"⚠️ PDF {filename} não é um currículo (classificação local)")
+                    return OcrError(error=f"Arquivo {filename} rejeitado, não é um currículo", rejected=True)
+                elif verdict is None:
+                    return OcrResponse(text=ocr_text, pages=page_stats, validated=False, thumbnail_pages=_pdf_validation_pages(file_bytes))
+
+                logger.debug(f"⚡ PDF classificado localmente como currículo: {filename} ({len(ocr_texts)} página(s) com OCR)")
+                return OcrResponse(text=ocr_text, pages=page_stats)
             except Exception as e:
                 return OcrError(error=f"Erro crítico no fallback de OCR para PDF: {e}")
     
     else:
         return OcrError(error="Erro: Tipo de arquivo não suportado. Use PDF, PNG, JPG ou JPEG.")
-    
-def preprocess_image(image_bytes: bytes) -> Image:
-    """Pre processa a imagem para otimização do OCR."""
 
+def validation_pages(file_bytes: bytes) -> list[int]:
+    """
+    Retorna as páginas de um PDF de imagem selecionadas para a validação visual, sem aplicar OCR.
+
+    Usada no modo PDF_PAGE_VALIDATION_CONCURRENT para iniciar a validação visual
+    em paralelo com o OCR. Retorna uma lista vazia para PDFs com camada de texto.
+    """
+    page_texts, ocr_pages = _read_pdf_text_layer(file_bytes)
+    native_text = "".join(text for i, text in enumerate(page_texts) if i not in ocr_pages)
+    if len(native_text.strip()) > 200:
+        return []
+    return _pdf_validation_pages(file_bytes)
+
+def render_thumbnails(file_bytes: bytes, filename: str, page_indexes: list[int]) -> list[str | None]:
+    """
+    Gera as miniaturas de validação das páginas indicadas (imagens têm apenas a página 0).
+
+    Roda nos workers de OCR. As páginas de PDFs são renderizadas diretamente na
+    resolução da miniatura, sem passar pela rasterização em alta resolução usada
+    no OCR. Páginas que não puderem ser renderizadas retornam None.
+    """
+    if not filename.lower().endswith('.pdf'):
+        return [validation_service.get_thumbnail(file_bytes)]
+
+    try:
+        pdf_document = fitz.open(stream=file_bytes, filetype="pdf")
+    except Exception as e:
+        logger.debug(f"🔄 Miniaturas de validação indisponíveis: {str(e)[:50]}...")
+        return [None] * len(page_indexes)
+
+    try:
+        thumbnails = []
+        for index in page_indexes:
+            page = pdf_document[index]
+            dpi = VALIDATION_THUMBNAIL_MAX_SIDE * 72 / max(page.rect.width, page.rect.height)
+            pixmap = page.get_pixmap(dpi=max(int(dpi), 1), colorspace=fitz.csGRAY, alpha=False)
+            page_image = Image.frombytes("L", (pixmap.width, pixmap.height), pixmap.samples)
+            thumbnails.append(validation_service.get_thumbnail(page_image))
+        return thumbnails
+    finally:
+        pdf_document.close()
+
+async def get_validation_thumbnails(file_bytes: bytes, file_hash: str, filename: str, page_indexes: list[int]) -> list[str]:
+    """
+    Retorna as miniaturas de validação das páginas indicadas.
+
+    Roda no processo principal: as miniaturas ficam em cache por (hash do arquivo,
+    página), de modo que retentativas, reenvios e a validação especulativa não
+    decodificam nem renderizam as páginas novamente. Apenas as páginas ausentes
+    do cache são renderizadas, no pool de OCR.
+    """
+    thumbnails = {index: _thumbnail_cache.get(f"{file_hash}:{index}") for index in page_indexes}
+    missing = [index for index, thumbnail in thumbnails.items() if thumbnail is None]
+    if missing:
+        rendered = await run_in_pool(render_thumbnails, file_bytes, filename, missing)
+        for index, thumbnail in zip(missing, rendered):
+            if thumbnail is not None:
+                _thumbnail_cache.set(f"{file_hash}:{index}", thumbnail)
+            thumbnails[index] = thumbnail
+    else:
+        logger.debug(f"⚡ Miniaturas de validação obtidas do cache: {filename}")
+    return [thumbnails[index] for index in page_indexes if thumbnails[index] is not None]
+
+async def validate_extraction(
+    result: OcrResponse,
+    filename: str,
+    file_bytes: bytes,
+    file_hash: str,
+    validation: Awaitable[bool | validation_service.ValidationError | None] | None = None,
+) -> OcrResponse | OcrError:
+    """
+    Valida com IA um resultado que o classificador local não conseguiu decidir.
+
+    Roda no processo principal, com o cliente assíncrono compartilhado da Groq.
+    Resultados com páginas para a validação visual são validados pelo modelo de
+    visão (todas as páginas selecionadas em paralelo); os demais, pelo texto extraído.
+
+    Parâmetros:
+        result: resultado de extract_text_from_file com validated=False
+        filename: nome do arquivo
+        file_bytes: conteúdo do arquivo (para gerar as miniaturas)
+        file_hash: SHA-256 do conteúdo (chave do cache de miniaturas)
+        validation: validação visual já iniciada em paralelo com o OCR (opcional);
+            se resolver para None, as páginas do resultado são validadas
+
+    Retorna:
+        OcrResponse validado (ou com validated=False, se o provedor estiver indisponível
+        ou a validação de uma imagem direta falhar),
+        ou OcrError se o arquivo for rejeitado ou a validação falhar.
+    """
+    verdict = await validation if validation is not None else None
+
+    if verdict is None and result.thumbnail_pages:
+        thumbnails = await get_validation_thumbnails(file_bytes, file_hash, filename, result.thumbnail_pages)
+        if thumbnails:
+            logger.debug(f"🤖 Validando {len(thumbnails)} imagem(ns) com IA: {filename}")
+            verdict = await validate_thumbnails(thumbnails, filename)
+
+    if verdict is None:
+        logger.debug(f"🤖 Iniciando validação de texto com IA: {filename}")
+        verdict = await validation_service.validate_text_content(result.text, filename)
+
+    if isinstance(verdict, validation_service.ValidationError) and verdict.unavailable:
+        # Provedor indisponível: o texto segue sem validação (modo degradado)
+        logger.warning(f"⚠️ Validação do arquivo {filename} adiada, serviço de IA indisponível")
+        return OcrResponse(text=result.text, pages=result.pages, validated=False)
+    elif isinstance(verdict, validation_service.ValidationError):
+        # Falhas na validação de imagens diretas não bloqueiam o processamento,
+        # mas o texto segue sem validação (e não é gravado no cache como confirmado)
+        if result.thumbnail_pages and not filename.lower().endswith('.pdf'):
+            logger.warning(f"⚠️ Erro na validação da imagem {filename}: {verdict.error}")
+            return OcrResponse(text=result.text, pages=result.pages, validated=False)
+        else:
+            logger.warning(f"⚠️ Erro na validação do arquivo {filename}: {verdict.error}")
+            return OcrError(error=f"Erro na validação do arquivo {filename}: {verdict.error}")
+    elif not verdict:
+        logger.warning(f"⚠️ Arquivo {filename} rejeitado, não é um currículo")
+        return OcrError(error=f"Arquivo {filename} rejeitado, não é um currículo", rejected=True)
+    else:
+        logger.debug(f"✅ Currículo validado pela IA - {filename}")
+
+    return OcrResponse(text=result.text, pages=result.pages)
+
+async def validate_thumbnails(thumbnails: list[str], filename: str) -> bool | validation_service.ValidationError:
+    """
+    Valida miniaturas com o modelo de visão, em paralelo.
+
+    Retorna False se alguma página for rejeitada, ValidationError se alguma
+    validação falhar e True se todas forem aceitas.
+    """
+    verdicts = await asyncio.gather(
+        *(validation_service.validate_image_content(thumbnail, filename) for thumbnail in thumbnails)
+    )
+    if any(verdict is False for verdict in verdicts):
+        return False
+    for verdict in verdicts:
+        if isinstance(verdict, validation_service.ValidationError):
+            return verdict
+    return True
+
+def _read_pdf_text_layer(file_bytes: bytes) -> tuple[list[str], list[int]]:
+    """
+    Extrai a camada de texto de cada página de um PDF.
+
+    Retorna:
+        Texto nativo de cada página e os índices das páginas que precisam de OCR.
+        Listas vazias se o PDF não puder ser lido pelo PyMuPDF.
+    """
+    page_texts = []
+    ocr_pages = []
     try:
-        logger.debug("🔧 Iniciando preprocessamento: carregamento da imagem")
-        # Carrega a imagem
-        imagem = np.frombuffer(image_bytes, dtype=np.uint8)
-        image = cv2.imdecode(imagem, cv2.IMREAD_COLOR)
+        pdf_document = fitz.open(stream=file_bytes, filetype="pdf")
+        for i, page in enumerate(pdf_document):
+            page_text = page.get_text()
+            page_texts.append(page_text)
+            if _page_needs_ocr(page, page_text):
+                ocr_pages.append(i)
+        pdf_document.close()
+    except Exception as e:
+        logger.debug(f"🔄 Extração direta de PDF falhou, usando OCR como fallback: {str(e)[:50]}...")
+        return [], []
+    return page_texts, ocr_pages
+
+def _page_needs_ocr(page: fitz.Page, page_text: str) -> bool:
+    """
+    Classifica se uma página de PDF precisa de OCR.
+
+    Páginas com pouco texto nativo e com imagens (digitalizadas) ou sem nenhum
+    texto precisam de OCR. Páginas curtas compostas apenas de texto usam a
+    camada de texto existente.
+    """
+    text_length = len(page_text.strip())
+    if text_length >= PDF_PAGE_MIN_TEXT_CHARS:
+        return False
+    return text_length == 0 or bool(page.get_images())
+
+def _classify_pdf_text(text: str, filename: str) -> OcrError | bool:
+    """
+    Pré-classifica localmente o texto de um PDF (nativo ou montado com as páginas do OCR).
+
+    Retorna OcrError se o arquivo for rejeitado, True se for aceito e False se
+    o texto estiver na faixa de incerteza e precisar da validação com IA.
+    """
+    verdict = resume_classifier.classify_resume_text(text)
+    if verdict is None:
+        logger.debug(f"⏭️ Texto na faixa de incerteza, validação com IA pendente: {filename}")
+        return False
+    if not verdict:
+        logger.warning(f"⚠️ Arquivo {filename} rejeitado, não é um currículo (classificação local)")
+        return OcrError(error=f"Arquivo {filename} rejeitado, não é um currículo", rejected=True)
+    logger.debug(f"⚡ Texto classificado localmente como currículo: {filename}")
+    return True
+
+def _ocr_pdf_pages(
+    file_bytes: bytes,
+    filename: str,
+    page_indexes: list[int] | None = None,
+) -> tuple[dict[int, str], list[OcrPageStats]]:
+    """
+    Aplica OCR, em paralelo, nas páginas indicadas de um PDF.
 
+    Parâmetros:
+        file_bytes: conteúdo do PDF
+        filename: nome do arquivo
+        page_indexes: índices (base 0) das páginas a processar; None processa todas
+
+    Retorna:
+        Dicionário índice da página -> texto extraído e as estatísticas de cada página.
+    """
+    page_indexes, pages = _rasterize_pdf(file_bytes, page_indexes)
+    logger.debug(f"📄 Convertendo {len(page_indexes)} páginas do PDF para imagens ({PDF_RASTER_BACKEND}, {PDF_RASTER_DPI} DPI): {filename}")
+
+    page_tasks = (
+        partial(_ocr_pdf_page, page_image, index + 1)
+        for index, page_image in zip(page_indexes, pages)
+    )
+    texts = {}
+    stats = []
+    for index, (page_text, page_stats) in zip(page_indexes, _run_pages_in_parallel(page_tasks, len(page_indexes))):
+        texts[index] = page_text
+        stats.append(page_stats)
+    return texts, stats
+
+def _select_validation_pages(page_count: int) -> list[int] | None:
+    """
+    Seleciona, conforme PDF_PAGE_VALIDATION_POLICY, os índices (base 0) das páginas validadas com IA.
+
+    Retorna None (todas as páginas) para a política "all".
+    """
+    if PDF_PAGE_VALIDATION_POLICY == "all":
+        return None
+    if PDF_PAGE_VALIDATION_POLICY == "first":
+        return [0] if page_count else []
+
+    selected = min(PDF_PAGE_VALIDATION_PAGES, page_count)
+    if PDF_PAGE_VALIDATION_POLICY == "sampled" and selected > 1:
+        # Páginas distribuídas uniformemente, incluindo a primeira e a última
+        return sorted({round(i * (page_count - 1) / (selected - 1)) for i in range(selected)})
+    return list(range(selected))
+
+def _pdf_validation_pages(file_bytes: bytes) -> list[int]:
+    """
+    Retorna as páginas selecionadas pela política de validação.
+
+    Se o PDF não puder ser lido pelo PyMuPDF, retorna uma lista vazia (a
+    validação usa o texto).
+    """
+    try:
+        with fitz.open(stream=file_bytes, filetype="pdf") as pdf_document:
+            page_count = pdf_document.page_count
+    except Exception as e:
+        logger.debug(f"🔄 Miniaturas de validação indisponíveis, validação pelo texto: {str(e)[:50]}...")
+        return []
+
+    page_indexes = _select_validation_pages(page_count)
+    return list(range(page_count)) if page_indexes is None else page_indexes
+
+def _rasterize_pdf(file_bytes: bytes, page_indexes: list[int] | None = None) -> tuple[list[int], Iterator[np.ndarray]]:
+    """
+    Converte páginas de um PDF em arrays de imagem em escala de cinza.
+
+    Com o backend "pymupdf" as páginas são renderizadas sob demanda, uma por vez,
+    limitando o pico de memória ao tamanho de uma página. O backend "pdf2image"
+    (poppler) converte o documento inteiro antes de devolver as páginas.
+
+    Retorna:
+        Índices das páginas convertidas e um iterador com os arrays correspondentes, em ordem.
+    """
+    if PDF_RASTER_BACKEND == "pdf2image":
+        pages = convert_from_bytes(file_bytes, dpi=PDF_RASTER_DPI, grayscale=True)
+        if page_indexes is None:
+            page_indexes = list(range(len(pages)))
+        return page_indexes, (np.asarray(pages[i]) for i in page_indexes)
+
+    pdf_document = fitz.open(stream=file_bytes, filetype="pdf")
+    if page_indexes is None:
+        page_indexes = list(range(pdf_document.page_count))
+    return page_indexes, _iter_pdf_pixmaps(pdf_document, page_indexes)
+
+def _iter_pdf_pixmaps(pdf_document: fitz.Document, page_indexes: list[int]) -> Iterator[np.ndarray]:
+    """Renderiza as páginas do documento uma a uma, fechando-o ao final."""
+    try:
+        for index in page_indexes:
+            page = pdf_document[index]
+            pixmap = page.get_pixmap(dpi=PDF_RASTER_DPI, colorspace=fitz.csGRAY, alpha=False)
+            yield np.frombuffer(pixmap.samples, dtype=np.uint8).reshape(pixmap.height, pixmap.width)
+    finally:
+        pdf_document.close()
+
+def _ocr_pdf_page(page_image: np.ndarray, page_number: int) -> tuple[str, OcrPageStats]:
+    """Aplica em uma página de PDF a mesma normalização e OCR adaptativo usados para imagens diretas."""
+    logger.debug(f"🔧 Aplicando OCR na página {page_number}")
+    return ocr_image(normalize_resolution(page_image), page_number)
+
+_page_executor: ThreadPoolExecutor | None = None
+_page_executor_lock = threading.Lock()
+
+def _run_pages_in_parallel(tasks: Iterable[Callable[[], T]], page_count: int) -> Iterator[T]:
+    """
+    Executa as tarefas de página em paralelo e devolve os resultados na ordem original.
+
+    O paralelismo segue a capacidade ociosa do pool: além da thread do próprio
+    worker, são usadas até OCR_PAGE_PARALLELISM - 1 threads extras, apenas para
+    núcleos livres no momento (com o pool ocupado, as páginas são processadas em
+    sequência). Se o consumidor interromper a iteração, as páginas ainda não
+    iniciadas são canceladas.
+    """
+    extra = ocr_pool.reserve_idle_cores(min(page_count, OCR_PAGE_PARALLELISM) - 1)
+    try:
+        if extra == 0:
+            for task in tasks:
+                yield task()
+            return
+
+        global _page_executor
+        with _page_executor_lock:
+            if _page_executor is None:
+                _page_executor = ThreadPoolExecutor(max_workers=OCR_PAGE_PARALLELISM, thread_name_prefix="ocr-page")
+
+        logger.debug(f"⚡ OCR de {page_count} página(s) com {extra + 1} em paralelo")
+        pending = deque()
+        try:
+            for task in tasks:
+                pending.append(_page_executor.submit(task))
+                if len(pending) > extra:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+    finally:
+        ocr_pool.release_cores(extra)
+    
+# Resolução das amostras usadas para estimar o tamanho do texto
+_PROBE_MAX_SIDE = 1600
+# Largura de uma página A4 em polegadas, usada quando não há texto mensurável
+_A4_WIDTH_INCHES = 8.27
+# Tag EXIF de orientação
+_EXIF_ORIENTATION = 0x0112
+
+def decode_image(image_bytes: bytes) -> np.ndarray:
+    """
+    Decodifica os bytes de uma imagem para escala de cinza, já com a resolução normalizada para o OCR.
+
+    A orientação EXIF é aplicada (fotos de celular costumam vir gravadas de lado).
+    JPEGs grandes são decodificados em modo draft (redução feita na própria DCT):
+    a escala é estimada a partir de uma decodificação reduzida e a imagem em
+    resolução cheia nunca é materializada.
+    """
+    image = Image.open(io.BytesIO(image_bytes))
+    if image.format != "JPEG":
+        return normalize_resolution(np.asarray(ImageOps.exif_transpose(image).convert("L")))
+
+    # O modo draft trabalha com o tamanho gravado; a escala é calculada sobre a imagem já orientada
+    stored_size = image.size
+    rotated = image.getexif().get(_EXIF_ORIENTATION, 1) in (5, 6, 7, 8)
+    original_size = stored_size[::-1] if rotated else stored_size
+
+    probe = Image.open(io.BytesIO(image_bytes))
+    probe_ratio = min(1.0, _PROBE_MAX_SIDE / max(stored_size))
+    probe.draft("L", (round(stored_size[0] * probe_ratio), round(stored_size[1] * probe_ratio)))
+    probe = ImageOps.exif_transpose(probe)
+    scale = _resolution_scale(np.asarray(probe.convert("L")), original_size)
+
+    target_size = (round(original_size[0] * scale), round(original_size[1] * scale))
+    if scale < 1:
+        image.draft("L", (round(stored_size[0] * scale), round(stored_size[1] * scale)))
+        logger.debug(f"📐 JPEG decodificado em modo draft: {stored_size} -> {image.size}")
+    image = ImageOps.exif_transpose(image)
+    return _resize(np.asarray(image.convert("L")), target_size)
+
+def normalize_resolution(image: np.ndarray) -> np.ndarray:
+    """
+    Normaliza a resolução de uma imagem em escala de cinza para o OCR.
+
+    Imagens com texto grande demais (fotos em alta resolução) são reduzidas e
+    imagens com texto pequeno demais (digitalizações em baixa resolução) são
+    ampliadas até a altura de texto ideal para o Tesseract.
+    """
+    height, width = image.shape[:2]
+    scale = _resolution_scale(image, (width, height))
+    return _resize(image, (round(width * scale), round(height * scale)))
+
+def _resolution_scale(gray: np.ndarray, original_size: tuple[int, int]) -> float:
+    """
+    Calcula o fator de escala, relativo ao tamanho original, que leva a imagem à resolução ideal para o OCR.
+
+    A resolução efetiva é estimada pela altura mediana dos caracteres. Sem texto
+    mensurável, assume que o lado menor da imagem corresponde à largura de uma
+    página A4 para estimar o DPI.
+
+    Parâmetros:
+        gray: imagem em escala de cinza (pode ser uma versão reduzida da original)
+        original_size: (largura, altura) da imagem original
+    """
+    ratio = original_size[0] / gray.shape[1]
+    text_height = _estimate_text_height(gray)
+
+    if text_height is not None:
+        text_height *= ratio
+        min_height, max_height = OCR_TEXT_HEIGHT_RANGE
+        if min_height <= text_height <= max_height:
+            return 1.0
+        scale = OCR_TARGET_TEXT_HEIGHT / text_height
+        logger.debug(f"📐 Altura estimada do texto: {text_height:.1f}px")
+    else:
+        dpi = min(original_size) / _A4_WIDTH_INCHES
+        min_dpi, max_dpi = OCR_DPI_RANGE
+        if min_dpi <= dpi <= max_dpi:
+            return 1.0
+        scale = PDF_RASTER_DPI / dpi
+        logger.debug(f"📐 DPI estimado pelo tamanho da página: {dpi:.0f}")
+
+    return min(scale, OCR_MAX_UPSCALE)
+
+def _estimate_text_height(gray: np.ndarray) -> float | None:
+    """Estima a altura mediana (em pixels) dos caracteres pelos componentes conexos da imagem binarizada."""
+
+    probe_factor = min(1.0, _PROBE_MAX_SIDE / max(gray.shape[:2]))
+    if probe_factor < 1:
+        gray = cv2.resize(gray, None, fx=probe_factor, fy=probe_factor, interpolation=cv2.INTER_AREA)
+
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)
+    _, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+    heights = stats[1:, cv2.CC_STAT_HEIGHT]
+    widths = stats[1:, cv2.CC_STAT_WIDTH]
+
+    # Descarta ruído, linhas, fotos e blocos que não se parecem com caracteres
+    glyphs = (heights >= 3) & (heights <= gray.shape[0] // 20) & (widths <= heights * 4)
+    if np.count_nonzero(glyphs) < 20:
+        return None
+    return float(np.median(heights[glyphs])) / probe_factor
+
+def _resize(image: np.ndarray, size: tuple[int, int]) -> np.ndarray:
+    """Redimensiona para (largura, altura), usando INTER_AREA na redução e INTER_CUBIC na ampliação."""
+    height, width = image.shape[:2]
+    if (width, height) == size:
+        return image
+
+    interpolation = cv2.INTER_AREA if size[0] < width else cv2.INTER_CUBIC
+    logger.debug(f"📐 Normalizando resolução: {width}x{height} -> {size[0]}x{size[1]}")
+    return cv2.resize(image, size, interpolation=interpolation)
+
+def ocr_image(image: np.ndarray, page_number: int) -> tuple[str, OcrPageStats]:
+    """
+    Aplica OCR com preprocessamento adaptativo, guiado pela confiança do Tesseract.
+
+    O caminho rápido reconhece a imagem normalizada em escala de cinza. Apenas se a
+    confiança média das palavras ficar abaixo de OCR_CONFIDENCE_THRESHOLD a imagem
+    passa pelo preprocessamento completo (redução de ruído e binarização) e por um
+    novo reconhecimento; o resultado de maior confiança é mantido.
+    """
+    text, fast_confidence = recognize(image)
+    if fast_confidence >= OCR_CONFIDENCE_THRESHOLD:
+        return text, OcrPageStats(page=page_number, fast_confidence=fast_confidence, confidence=fast_confidence, escalated=False)
+
+    logger.debug(f"🔧 Confiança baixa na página {page_number} ({fast_confidence:.0f}), aplicando preprocessamento completo")
+    processed_text, processed_confidence = recognize(preprocess_image(image))
+    if processed_confidence > fast_confidence:
+        text = processed_text
+    confidence = max(fast_confidence, processed_confidence)
+
+    return text, OcrPageStats(page=page_number, fast_confidence=fast_confidence, confidence=confidence, escalated=True)
+
+def preprocess_image(image: np.ndarray) -> np.ndarray:
+    """
+    Pre processa a imagem para otimização do OCR.
+
+    Recebe um array RGB, RGBA ou em escala de cinza e devolve o array binarizado,
+    sem passar por codificação intermediária.
+    """
+
+    try:
         # Converte para escala de cinza
-        gray_image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        if image.ndim == 3:
+            conversion = cv2.COLOR_RGBA2GRAY if image.shape[2] == 4 else cv2.COLOR_RGB2GRAY
+            gray_image = cv2.cvtColor(image, conversion)
+        else:
+            gray_image = image
         logger.debug("🔧 Preprocessamento: conversão para escala de cinza")
         
         # Redução de ruído
@@ -145,18 +678,10 @@ def preprocess_image(image_bytes: bytes) -> Image:
 
         # Binarização
         processed_image = cv2.adaptiveThreshold(denoised_image, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2)
-        logger.debug("🔧 Preprocessamento: binarização adaptativa aplicada")
-
-        success, buffer = cv2.imencode('.png', processed_image)
-        if not success:
-            raise OcrError(error="Erro ao processar a imagem.")
-        
-        final_image = Image.open(io.BytesIO(buffer))
         logger.debug("✅ Preprocessamento concluído com sucesso")
 
-        return final_image
+        return processed_image
     
     except Exception as e:
         logger.warning(f"⚠️ Falha no preprocessamento, usando imagem original")
-        return Image.open(io.BytesIO(image_bytes))
-    
\ No newline at end of file
+        return image
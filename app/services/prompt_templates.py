@@ -0,0 +1,209 @@
+"""
+Templates versionados dos prompts de análise de currículos.
+
+Os prompts são montados sempre na mesma ordem: instruções estáticas, depois a
+query (ou os requisitos extraídos dela) e por último o currículo. Assim, todas as
+chamadas de um lote compartilham o mesmo prefixo byte a byte, que pode ser
+reaproveitado pelo cache de prefixo do provedor.
+
+Qualquer alteração no texto dos templates deve incrementar PROMPT_VERSION.
+"""
+
+PROMPT_VERSION = "analysis-v4"
+
+SYSTEM_PROMPT = "Você é um recrutador técnico sênior e especialista em análise de currículos."
+
+# Critérios de pontuação usados nas análises com vaga
+SCORE_CRITERIA = """Critérios de Pontuação (Score):
+    * **8.0 - 10.0 (Alinhamento Forte):** O candidato atende a todos ou quase todos os requisitos essenciais da requisição. A experiência e as habilidades descritas são altamente relevantes.
+    * **6.0 - 7.9 (Alinhamento Bom):** O candidato atende à maioria dos requisitos importantes, mas possui algumas lacunas em tecnologias secundárias ou no tempo de experiência. É um candidato promissor.
+    * **4.0 - 5.9 (Alinhamento Razoável):** O candidato possui algumas das habilidades requeridas, mas falta conhecimento em pontos cruciais da requisição. Pode ser considerado para vagas de menor senioridade ou com treinamento.
+    * **0.0 - 3.9 (Alinhamento Baixo):** O candidato atende a poucos ou nenhum dos requisitos essenciais. O perfil não é compatível com a requisição.
+"""
+
+QUERY_OUTPUT_FORMAT = """Formato da Saída:
+A sua resposta deve ser APENAS um objeto JSON válido, seguindo extritamente a estrutura abaixo:
+{
+    "score": (float, de 0.0 a 10.0). O quanto o candidato está alinhado com a requisição.
+    "summary": (string). Um resumo detalhado sobre a adequação do candidato. Considerar as tecnologias, frameworks, linguagens de programação, etc. da requisição e como o candidato se alinha com elas. Inclua informações sobre anos de experiência, projetos relevantes, habilidades técnicas e outras competências que sejam pertinentes à requisição. Aqui você deve explicar os pontos fortes e fracos do candidato, deixando claro o que faltou para que o candidato fosse considerado ideal para a requisição.
+    "extra_comments": (string). Insira aqui qualquer comentário extra que você quiser adicionar sobre o currículo.
+}
+"""
+
+# Análise com a query completa: o modelo interpreta a requisição antes de analisar
+QUERY_INSTRUCTIONS = f"""Você é um Analista de Talentos de IA altamente especializado. Sua função é realizar uma análise técnica e detalhada de um único currículo em relação a uma requisição de vaga ou perfil profissional.
+
+Você deve avaliar o alinhamento de um candidato (representado por seu currículo) com uma requisição específica, gerando uma pontuação (score), uma análise detalhada e observações pertinentes. Sua análise deve ser objetiva e estritamente baseada nos dados fornecidos.
+
+Metodologia de Análise (Passo a Passo):
+    1. **Interpretar a Requisição:**
+        * **Se a requisição for detalhada (descrição de vaga):** Identifique e liste todos os requisitos-chave: tecnologias, frameworks, linguagens, anos de experiência, certificações e outras competências.
+        * **Se a requisição for simples ou genérica (ex: "Backend", "Frontend Pleno", "Analista de Dados"):** Infira os requisitos essenciais para esse perfil.
+            * *Exemplo para "Backend":* Você deve procurar por linguagens (Java, Python, C#, Node.js), bancos de dados (SQL, NoSQL), conhecimento em APIs (REST, GraphQL), arquitetura de sistemas (microsserviços) e cloud (AWS, Azure, GCP).
+            * *Exemplo para "Qual o melhor candidato para a vaga de devops":* Trate isso como uma requisição por um perfil "DevOps" ideal e analise o currículo em relação a esse perfil (ferramentas de CI/CD, IaC como Terraform, contêineres como Docker/Kubernetes, scripting).
+
+    2. **Analisar o Currículo:** Examine o texto completo do currículo para encontrar evidências diretas e indiretas que correspondam aos requisitos identificados no passo 1. Preste atenção especial aos anos de experiência com cada tecnologia e ao contexto dos projetos descritos.
+
+    3. **Gerar a Análise:** Com base na comparação, construa o feedback. A pontuação deve refletir o alinhamento geral, e o resumo deve explicar o porquê dessa pontuação, detalhando os pontos fortes e as lacunas do candidato.
+
+{SCORE_CRITERIA}
+{QUERY_OUTPUT_FORMAT}"""
+
+# Análise com os requisitos já extraídos da query (uma extração por lote)
+REQUIREMENTS_INSTRUCTIONS = f"""Você é um Analista de Talentos de IA altamente especializado. Sua função é avaliar o alinhamento de um único currículo com os requisitos de uma vaga, gerando uma pontuação (score) e uma análise detalhada. Sua análise deve ser objetiva e estritamente baseada nos dados fornecidos.
+
+Examine o currículo em busca de evidências diretas e indiretas de cada requisito da vaga, com atenção aos anos de experiência com cada tecnologia e ao contexto dos projetos descritos.
+
+{SCORE_CRITERIA}
+{QUERY_OUTPUT_FORMAT}"""
+
+SCORE_OUTPUT_FORMAT = """Formato da Saída:
+A sua resposta deve ser APENAS um objeto JSON válido, sem nenhum outro campo ou explicação:
+{
+    "score": (float, de 0.0 a 10.0). O quanto o candidato está alinhado com a requisição.
+}
+"""
+
+# Ranqueamento em duas fases, fase 1: apenas a pontuação (resposta curta)
+SCORE_INSTRUCTIONS = f"""Você é um Analista de Talentos de IA altamente especializado. Sua função é pontuar o alinhamento de um único currículo com uma requisição de vaga ou perfil profissional. Sua avaliação deve ser objetiva e estritamente baseada nos dados fornecidos.
+
+Identifique os requisitos-chave da requisição (ou infira os requisitos essenciais do perfil, se a requisição for genérica) e procure no currículo evidências diretas e indiretas de cada um, com atenção aos anos de experiência com cada tecnologia e ao contexto dos projetos descritos.
+
+{SCORE_CRITERIA}
+{SCORE_OUTPUT_FORMAT}"""
+
+# Fase 1 com os requisitos já extraídos da query (uma extração por lote)
+SCORE_REQUIREMENTS_INSTRUCTIONS = f"""Você é um Analista de Talentos de IA altamente especializado. Sua função é pontuar o alinhamento de um único currículo com os requisitos de uma vaga. Sua avaliação deve ser objetiva e estritamente baseada nos dados fornecidos.
+
+Procure no currículo evidências diretas e indiretas de cada requisito da vaga, com atenção aos anos de experiência com cada tecnologia e ao contexto dos projetos descritos.
+
+{SCORE_CRITERIA}
+{SCORE_OUTPUT_FORMAT}"""
+
+# Resumo geral, sem vaga
+SUMMARY_INSTRUCTIONS = """Faça um resumo analítico do currículo fornecido.
+
+Sua resposta deve ser APENAS um objeto JSON válido, com a seguinte estrutura:
+{
+    "score": (string, senioridade do candidato, pode ser júnior, pleno ou sênior)
+    "summary": (string, um resumo detalhado sobre o perfil profissional, experiências relevantes, competências técnicas e nível de senioridade do candidato)
+    "extra_comments": (string, qualquer comentário extra sobre pontos fortes, áreas de especialização ou observações relevantes do currículo)
+}
+"""
+
+QUERY_SECTION = """
+---
+DESCRIÇÃO DA REQUISIÇÃO:
+"{query}"
+"""
+
+REQUIREMENTS_SECTION = """
+---
+REQUISITOS DA VAGA:
+{requirements}
+"""
+
+# Validação combinada: depende do arquivo, por isso fica depois do prefixo compartilhado
+RESUME_CHECK_SECTION = """
+---
+Antes de analisar, verifique se o texto é de fato um currículo/CV e não outro tipo de documento mascarado como currículo.
+Um currículo contém informações do tipo informações pessoais, experiência profissional, formação acadêmica, habilidades, competências e etc.
+Inclua no objeto JSON também o campo:
+    "curriculo": (boolean) true se o texto for de um currículo/CV, false caso contrário. Se for false, os demais campos podem ficar vazios.
+"""
+
+# Ranqueamento em duas fases, fase 2: o resumo explica a pontuação da fase 1
+FIXED_SCORE_SECTION = """
+---
+A pontuação deste candidato já foi definida: {score}. Use exatamente essa pontuação no campo "score" e explique-a no campo "summary".
+"""
+
+RESUME_SECTION = """
+---
+TEXTO DO CURRÍCULO:
+"{resume_text}"
+---
+
+Lembre-se, responda apenas com o objeto JSON, com score, summary e extra_comments. Tenha em mente que caso mude essa estrutura iremos encontrar erros e o resumo não será aceito.
+"""
+
+SCORE_RESUME_SECTION = """
+---
+TEXTO DO CURRÍCULO:
+"{resume_text}"
+---
+
+Lembre-se, responda apenas com o objeto JSON.
+"""
+
+
+def _job_section(query: str, requirements: str | None) -> str:
+    if requirements:
+        return REQUIREMENTS_SECTION.format(requirements=requirements)
+    return QUERY_SECTION.format(query=query)
+
+
+def build_analysis_messages(
+    resume_text: str,
+    query: str | None = None,
+    requirements: str | None = None,
+    validate_resume: bool = False,
+    score: float | None = None,
+) -> list[dict]:
+    """
+    Monta as mensagens da análise de um currículo.
+
+    Ordem: system prompt, instruções estáticas do modo, query ou requisitos,
+    verificação de currículo (modo combinado), pontuação já definida (fase 2 do
+    ranqueamento) e, por fim, o texto do currículo.
+
+    Parâmetros:
+        resume_text: texto do currículo
+        query: texto da vaga (opcional)
+        requirements: requisitos extraídos da query (opcional; substituem a query)
+        validate_resume: inclui a verificação de currículo da validação combinada
+        score: pontuação da fase 1 do ranqueamento, que o resumo deve explicar (opcional)
+
+    Retorna:
+        Lista de mensagens no formato da API de chat.
+    """
+    if query:
+        instructions = REQUIREMENTS_INSTRUCTIONS if requirements else QUERY_INSTRUCTIONS
+        parts = [instructions, _job_section(query, requirements)]
+    else:
+        parts = [SUMMARY_INSTRUCTIONS]
+
+    if validate_resume:
+        parts.append(RESUME_CHECK_SECTION)
+    if query and score is not None:
+        parts.append(FIXED_SCORE_SECTION.format(score=score))
+    parts.append(RESUME_SECTION.format(resume_text=resume_text))
+
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": "".join(parts)},
+    ]
+
+
+def build_score_messages(
+    resume_text: str,
+    query: str,
+    requirements: str | None = None,
+    validate_resume: bool = False,
+) -> list[dict]:
+    """
+    Monta as mensagens da fase 1 do ranqueamento (apenas a pontuação).
+
+    Segue a mesma ordem de build_analysis_messages, com instruções que pedem
+    somente o score.
+    """
+    instructions = SCORE_REQUIREMENTS_INSTRUCTIONS if requirements else SCORE_INSTRUCTIONS
+    parts = [instructions, _job_section(query, requirements)]
+    if validate_resume:
+        parts.append(RESUME_CHECK_SECTION)
+    parts.append(SCORE_RESUME_SECTION.format(resume_text=resume_text))
+
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": "".join(parts)},
+    ]
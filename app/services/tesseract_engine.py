@@ -0,0 +1,116 @@
+import os
+import logging
+import threading
+
+import numpy as np
+import pytesseract
+from PIL import Image
+
+from ..config.constants import OCR_ENGINE, PDF_RASTER_DPI, TESSERACT_LANG, TESSDATA_PATH, TESSERACT_OMP_THREADS
+
+# O limite de threads do OpenMP precisa estar definido antes de a libtesseract ser carregada.
+# Também é herdado pelos subprocessos do pytesseract.
+if TESSERACT_OMP_THREADS:
+    os.environ["OMP_THREAD_LIMIT"] = str(TESSERACT_OMP_THREADS)
+
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+logger = logging.getLogger(__name__)
+
+# Os handles da API do Tesseract não são thread-safe: cada thread mantém o seu.
+_thread_local = threading.local()
+_tesserocr_unavailable = tesserocr is None
+_fallback_warned = False
+
+
+def _use_tesserocr() -> bool:
+    global _fallback_warned
+    if OCR_ENGINE != "tesserocr":
+        return False
+    if _tesserocr_unavailable:
+        if not _fallback_warned:
+            logger.warning("⚠️ tesserocr indisponível, usando pytesseract (subprocesso por imagem)")
+            _fallback_warned = True
+        return False
+    return True
+
+
+def _get_api() -> "tesserocr.PyTessBaseAPI | None":
+    """
+    Retorna o handle da API do Tesseract da thread atual, inicializando-o na primeira chamada.
+
+    Se a inicialização falhar (ex.: modelos não encontrados em TESSDATA_PATH),
+    o engine é desativado no processo e None é retornado.
+    """
+    global _tesserocr_unavailable
+    api = getattr(_thread_local, "api", None)
+    if api is None:
+        try:
+            api = tesserocr.PyTessBaseAPI(path=TESSDATA_PATH, lang=TESSERACT_LANG)
+        except RuntimeError as e:
+            logger.error(f"❌ Falha ao inicializar o Tesseract via tesserocr: {e}")
+            _tesserocr_unavailable = True
+            return None
+        _thread_local.api = api
+        logger.debug(f"🔧 Handle do Tesseract inicializado ({TESSERACT_LANG}) - thread {threading.current_thread().name}")
+    return api
+
+
+def recognize(image: np.ndarray) -> tuple[str, float]:
+    """
+    Aplica o Tesseract sobre um array de imagem (escala de cinza, RGB ou RGBA).
+
+    Com o engine "tesserocr", o buffer do array é entregue diretamente a um handle
+    da API C mantido vivo por thread, sem subprocesso nem arquivo temporário.
+    Com o engine "pytesseract", a imagem é gravada em formato PNM, sem compressão,
+    e processada pelo binário do Tesseract.
+
+    Retorna:
+        Texto reconhecido e a confiança média das palavras (0 a 100).
+    """
+    api = _get_api() if _use_tesserocr() else None
+    if api is not None:
+        image = np.ascontiguousarray(image)
+        height, width = image.shape[:2]
+        bytes_per_pixel = 1 if image.ndim == 2 else image.shape[2]
+        api.SetImageBytes(image.tobytes(), width, height, bytes_per_pixel, width * bytes_per_pixel)
+        # Buffers crus não carregam DPI; sem ele o Tesseract estima a resolução e avisa no log.
+        # Páginas de PDF são renderizadas em PDF_RASTER_DPI e imagens são normalizadas para a
+        # altura de texto equivalente
+        api.SetSourceResolution(PDF_RASTER_DPI)
+        text = api.GetUTF8Text()
+        return text, float(api.MeanTextConf())
+
+    tesseract_image = Image.fromarray(image)
+    tesseract_image.format = "PPM"
+    data = pytesseract.image_to_data(
+        tesseract_image, lang=TESSERACT_LANG, config=f"--dpi {PDF_RASTER_DPI}", output_type=pytesseract.Output.DICT
+    )
+    return _text_from_data(data)
+
+
+def _text_from_data(data: dict) -> tuple[str, float]:
+    """Reconstrói o texto (linhas e parágrafos) e a confiança média a partir da saída do image_to_data."""
+    lines: dict[tuple[int, int, int], list[str]] = {}
+    confidences = []
+    for i, word in enumerate(data["text"]):
+        confidence = float(data["conf"][i])
+        if not word.strip() or confidence < 0:
+            continue
+        key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+        lines.setdefault(key, []).append(word)
+        confidences.append(confidence)
+
+    text = ""
+    previous_paragraph = None
+    for (block, paragraph, _), words in lines.items():
+        if previous_paragraph is not None and (block, paragraph) != previous_paragraph:
+            text += "\n"
+        text += " ".join(words) + "\n"
+        previous_paragraph = (block, paragraph)
+
+    mean_confidence = sum(confidences) / len(confidences) if confidences else 0.0
+    return text, mean_confidence
@@ -0,0 +1,207 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def hash_bytes(data: bytes) -> str:
+    """Calcula o SHA-256 (hex) de um conteúdo binário."""
+    return hashlib.sha256(data).hexdigest()
+
+
+class LRUCache:
+    """
+    Cache em memória com política LRU e expiração opcional por idade.
+
+    Seguro para uso entre threads.
+    """
+
+    def __init__(self, max_items: int, ttl_seconds: Optional[float] = None):
+        self.max_items = max_items
+        self.ttl_seconds = ttl_seconds
+        self._items: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+
+            created_at, value = item
+            if self.ttl_seconds is not None and time.time() - created_at > self.ttl_seconds:
+                del self._items[key]
+                return None
+
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self._items[key] = (time.time(), value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+class DiskCache:
+    """
+    Cache em disco limitado por tamanho total e idade dos registros.
+
+    Cada registro é um arquivo JSON nomeado pela chave. A remoção é feita por
+    idade (registros expirados) e, em seguida, pelos acessos mais antigos até
+    que o diretório volte a respeitar o limite de tamanho.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, max_age_seconds: float):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        self._size: Optional[int] = None
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Any]:
+        path = self._path(key)
+        try:
+            stat = path.stat()
+            if time.time() - stat.st_mtime > self.max_age_seconds:
+                self._remove(path)
+                return None
+
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+
+            # Atualiza o mtime para que a remoção por tamanho siga a ordem de uso
+            os.utime(path)
+            return value
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"⚠️ Registro de cache em disco inválido ({key[:12]}): {e}")
+            self._remove(path)
+            return None
+
+    def set(self, key: str, value: Any):
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self._path(key)
+            tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(value, f, ensure_ascii=False)
+
+            previous_size = path.stat().st_size if path.exists() else 0
+            os.replace(tmp_path, path)
+
+            with self._lock:
+                if self._size is None:
+                    self._size = self._scan_size()
+                else:
+                    self._size += path.stat().st_size - previous_size
+
+                if self._size > self.max_bytes:
+                    self._evict()
+        except Exception as e:
+            logger.warning(f"⚠️ Falha ao gravar cache em disco ({key[:12]}): {e}")
+
+    def _remove(self, path: Path):
+        try:
+            size = path.stat().st_size
+            path.unlink()
+            with self._lock:
+                if self._size is not None:
+                    self._size -= size
+        except FileNotFoundError:
+            pass
+
+    def _scan_size(self) -> int:
+        return sum(entry.stat().st_size for entry in self.directory.glob("*.json"))
+
+    def _evict(self):
+        """Remove registros expirados e, se necessário, os menos usados recentemente."""
+        now = time.time()
+        entries = []
+        for entry in self.directory.glob("*.json"):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            if now - stat.st_mtime > self.max_age_seconds:
+                entry.unlink(missing_ok=True)
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry))
+
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        # Libera espaço até 90% do limite para evitar varreduras a cada gravação
+        target = int(self.max_bytes * 0.9)
+        removed = 0
+        for _, size, entry in entries:
+            if total <= target:
+                break
+            entry.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+
+        self._size = total
+        logger.debug(f"🧹 Cache em disco {self.directory}: {removed} registro(s) removido(s), {total} bytes em uso")
+
+
+class TieredCache:
+    """
+    Cache em dois níveis: LRU em memória na frente de um cache em disco.
+
+    Em corrotinas, use get_async/set_async: o acesso ao disco (leitura, gravação
+    e varreduras de tamanho e remoção) roda em uma thread, fora do event loop.
+    """
+
+    def __init__(self, memory: LRUCache, disk: Optional[DiskCache] = None):
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+
+        if self.disk is None:
+            return None
+
+        value = self.disk.get(key)
+        if value is not None:
+            self.memory.set(key, value)
+        return value
+
+    def set(self, key: str, value: Any):
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+
+    async def get_async(self, key: str) -> Optional[Any]:
+        value = self.memory.get(key)
+        if value is not None or self.disk is None:
+            return value
+
+        value = await asyncio.to_thread(self.disk.get, key)
+        if value is not None:
+            self.memory.set(key, value)
+        return value
+
+    async def set_async(self, key: str, value: Any):
+        self.memory.set(key, value)
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.set, key, value)
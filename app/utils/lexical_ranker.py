@@ -0,0 +1,148 @@
+import re
+import unicodedata
+from collections import Counter
+
+import numpy as np
+
+from ..config.constants import LEXICAL_BM25_K1, LEXICAL_BM25_B
+
+# Sinônimos e grafias alternativas de habilidades, normalizados para um termo canônico.
+# As chaves já estão no formato de _normalize (minúsculas, sem acentos).
+SKILL_SYNONYMS = {
+    "react": ("reactjs", "react.js", "react js"),
+    "react native": ("react-native",),
+    "node": ("nodejs", "node.js", "node js"),
+    "vue": ("vuejs", "vue.js"),
+    "angular": ("angularjs", "angular.js"),
+    "next": ("nextjs", "next.js"),
+    "javascript": ("js", "ecmascript", "es6"),
+    "typescript": ("ts",),
+    "python": ("py",),
+    "golang": ("go lang",),
+    "csharp": ("c#",),
+    "cpp": ("c++",),
+    "dotnet": (".net", "asp.net", "dot net"),
+    "postgresql": ("postgres", "psql"),
+    "mongodb": ("mongo",),
+    "sql server": ("mssql",),
+    "aws": ("amazon web services", "ec2", "s3", "lambda", "cloudformation", "redshift", "emr", "glue"),
+    "gcp": ("google cloud", "google cloud platform", "bigquery"),
+    "azure": ("microsoft azure",),
+    "kubernetes": ("k8s", "eks", "aks", "gke", "helm"),
+    "docker": ("containers", "conteineres", "container", "conteiner"),
+    "terraform": ("iac", "infraestrutura como codigo", "infrastructure as code"),
+    "ci/cd": ("cicd", "ci cd", "integracao continua", "continuous integration", "github actions", "gitlab ci", "jenkins"),
+    "machine learning": ("ml", "aprendizado de maquina"),
+    "inteligencia artificial": ("ia", "ai", "artificial intelligence"),
+    "frontend": ("front-end", "front end"),
+    "backend": ("back-end", "back end"),
+    "fullstack": ("full-stack", "full stack"),
+    "devops": ("dev ops", "sre"),
+    "microsservicos": ("microservices", "microsservico", "microservice", "micro servicos"),
+    "spark": ("apache spark", "pyspark"),
+    "airflow": ("apache airflow",),
+}
+
+# Palavras muito comuns em queries e currículos, sem valor para o ranqueamento
+_STOPWORDS = {
+    "a", "o", "as", "os", "de", "da", "do", "das", "dos", "e", "em", "no", "na", "nos", "nas",
+    "um", "uma", "para", "por", "com", "sem", "que", "qual", "quem", "se", "ou", "ao", "aos",
+    "the", "and", "or", "of", "in", "on", "for", "with", "to", "an",
+    "vaga", "candidato", "candidatos", "melhor", "experiencia", "conhecimento", "conhecimentos",
+    "anos", "ano", "desejavel", "requisitos", "procuro", "busco", "profissional",
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9_+#./-]*")
+
+
+def _normalize(text: str) -> str:
+    """Minúsculas e sem acentos."""
+    text = unicodedata.normalize("NFKD", text.lower())
+    return "".join(char for char in text if not unicodedata.combining(char))
+
+
+def _build_canonical_patterns() -> list[tuple[re.Pattern, str]]:
+    """Expressões que substituem cada sinônimo pelo termo canônico (os mais longos primeiro)."""
+    variants = []
+    for canonical, synonyms in SKILL_SYNONYMS.items():
+        for variant in (canonical, *synonyms):
+            variants.append((variant, canonical))
+    variants.sort(key=lambda item: len(item[0]), reverse=True)
+    return [
+        (re.compile(rf"(?<![a-z0-9_]){re.escape(variant)}(?![a-z0-9_+#])"), _canonical_token(canonical))
+        for variant, canonical in variants
+    ]
+
+
+def _canonical_token(canonical: str) -> str:
+    """Termo canônico como um único token (ex.: "machine learning" -> "machine_learning")."""
+    return re.sub(r"[^a-z0-9+#]+", "_", canonical)
+
+
+_CANONICAL_PATTERNS = _build_canonical_patterns()
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Tokeniza o texto para o ranqueamento léxico.
+
+    Normaliza caixa e acentos, substitui sinônimos de habilidades pelo termo
+    canônico (ex.: "React.js" e "ReactJS" -> "react", "k8s" -> "kubernetes") e
+    descarta stopwords.
+    """
+    text = _normalize(text)
+    for pattern, token in _CANONICAL_PATTERNS:
+        text = pattern.sub(f" {token} ", text)
+    tokens = (token.rstrip("./-_") for token in _TOKEN_RE.findall(text))
+    return [token for token in tokens if token and token not in _STOPWORDS and (len(token) > 1 or token in "cr")]
+
+
+def bm25_scores(query: str, texts: list[str]) -> np.ndarray:
+    """
+    Pontua cada texto em relação à query com BM25, vetorizado sobre o lote.
+
+    O IDF é calculado sobre os próprios textos do lote. As pontuações são
+    normalizadas para 0-1 em relação ao melhor texto do lote.
+
+    Parâmetros:
+        query: texto da vaga
+        texts: textos extraídos dos currículos
+
+    Retorna:
+        Array com a pontuação léxica de cada texto, na mesma ordem.
+    """
+    terms = list(dict.fromkeys(tokenize(query)))
+    if not terms or not texts:
+        return np.zeros(len(texts))
+
+    index = {term: column for column, term in enumerate(terms)}
+    frequencies = np.zeros((len(texts), len(terms)))
+    lengths = np.zeros(len(texts))
+    for row, text in enumerate(texts):
+        tokens = tokenize(text)
+        lengths[row] = len(tokens)
+        for term, count in Counter(tokens).items():
+            column = index.get(term)
+            if column is not None:
+                frequencies[row, column] = count
+
+    document_frequency = np.count_nonzero(frequencies, axis=0)
+    idf = np.log1p((len(texts) - document_frequency + 0.5) / (document_frequency + 0.5))
+    average_length = lengths.mean() or 1.0
+    norm = LEXICAL_BM25_K1 * (1 - LEXICAL_BM25_B + LEXICAL_BM25_B * lengths / average_length)
+    scores = (idf * frequencies * (LEXICAL_BM25_K1 + 1) / (frequencies + norm[:, None])).sum(axis=1)
+
+    best = scores.max()
+    return scores / best if best > 0 else scores
+
+
+def top_k(query: str, texts: list[str], k: int) -> tuple[list[int], np.ndarray]:
+    """
+    Seleciona os k textos com maior pontuação BM25.
+
+    Retorna:
+        Índices dos k melhores textos (do melhor para o pior) e as pontuações de todos.
+    """
+    scores = bm25_scores(query, texts)
+    order = np.argsort(-scores, kind="stable")
+    return order[:k].tolist(), scores
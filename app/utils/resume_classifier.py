@@ -0,0 +1,136 @@
+import math
+import re
+import unicodedata
+
+from ..config.constants import RESUME_ACCEPT_THRESHOLD, RESUME_REJECT_THRESHOLD
+
+# Cabeçalhos de seção típicos de currículos (texto normalizado, sem acentos)
+_SECTION_HEADERS = {
+    "experiencia", "experiencia profissional", "experiencias", "historico profissional",
+    "formacao", "formacao academica", "educacao", "escolaridade",
+    "habilidades", "competencias", "competencias tecnicas", "conhecimentos", "tecnologias",
+    "idiomas", "cursos", "certificacoes", "certificados", "projetos",
+    "objetivo", "objetivo profissional", "resumo", "resumo profissional", "perfil", "perfil profissional",
+    "experience", "work experience", "professional experience", "education", "skills",
+    "technical skills", "languages", "certifications", "projects", "summary", "profile",
+}
+
+# Vocabulário profissional comum em currículos
+_RESUME_TERMS = {
+    "desenvolvedor", "desenvolvedora", "engenheiro", "engenheira", "analista", "gerente",
+    "coordenador", "coordenadora", "especialista", "estagio", "estagiario", "junior", "pleno", "senior",
+    "graduacao", "bacharel", "bacharelado", "licenciatura", "tecnologo", "mestrado", "doutorado", "mba",
+    "universidade", "faculdade", "instituto", "empresa", "responsavel", "atuacao", "atuei",
+    "desenvolvi", "liderei", "implementei", "projetos", "equipe", "carreira", "anos",
+    "developer", "engineer", "manager", "university", "degree", "bachelor",
+}
+
+# Termos de domínios que costumam ser confundidos com currículos (receitas, contratos, faturas)
+_NON_RESUME_TERMS = {
+    "receita", "ingredientes", "ingrediente", "xicara", "xicaras", "colher", "colheres", "forno",
+    "assar", "massa", "farinha", "acucar", "fermento", "manteiga", "modo de preparo", "untada",
+    "clausula", "contratante", "contratada", "rescisao", "foro",
+    "nota fiscal", "fatura", "boleto", "vencimento", "valor total", "subtotal",
+}
+
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+_PHONE_RE = re.compile(r"(?:\+?55\s?)?\(?\d{2}\)?\s?9?\d{4}[-\s]?\d{4}")
+_PROFILE_RE = re.compile(r"linkedin\.com|github\.com|gitlab\.com")
+_MONTH = r"(?:jan|fev|feb|mar|abr|apr|mai|may|jun|jul|ago|aug|set|sep|out|oct|nov|dez|dec)[a-z]*\.?"
+_DATE = rf"(?:{_MONTH}\s*(?:de\s*)?|\d{{1,2}}/)?(?:19|20)\d{{2}}"
+_DATE_RANGE_RE = re.compile(
+    rf"{_DATE}\s*(?:-|–|—|a|ate|to)\s*(?:{_DATE}|atual|atualmente|presente|present|hoje|current|o momento)"
+)
+_WORD_RE = re.compile(r"[a-z]+")
+
+
+def _normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text.lower())
+    return "".join(char for char in text if not unicodedata.combining(char))
+
+
+def _header_candidate(normalized_line: str) -> str | None:
+    """Retorna a linha limpa se ela puder ser um cabeçalho (linha curta), ou None."""
+    # Cabeçalhos são linhas curtas que começam com um nome de seção (ex.: "Habilidades Chave")
+    line = normalized_line.strip(" \t:-=_*#|>•●").strip()
+    if not line or len(line.split()) > 4:
+        return None
+    return line
+
+
+def _matches_header(line: str, header: str) -> bool:
+    return line == header or line.startswith(header + " ")
+
+
+def is_section_header(line: str) -> bool:
+    """Indica se a linha é um cabeçalho de seção típico de currículos (ex.: "Experiência Profissional")."""
+    candidate = _header_candidate(_normalize(line))
+    return candidate is not None and any(_matches_header(candidate, header) for header in _SECTION_HEADERS)
+
+
+def score_resume_text(text: str) -> float:
+    """
+    Estima localmente a probabilidade (0 a 1) de um texto ser um currículo.
+
+    Combina sinais estruturais (cabeçalhos de seção, períodos de datas, contatos)
+    e densidade de vocabulário profissional, penalizando vocabulário de
+    documentos frequentemente confundidos com currículos.
+    """
+    return _score_signals(text)[0]
+
+
+def _score_signals(text: str) -> tuple[float, int]:
+    """Retorna a pontuação de score_resume_text e o número de termos de não-currículo encontrados."""
+    normalized = _normalize(text)
+    words = _WORD_RE.findall(normalized)
+    if not words:
+        return 0.0, 0
+
+    header_lines = [line for line in map(_header_candidate, normalized.splitlines()) if line]
+    sections = sum(
+        1 for header in _SECTION_HEADERS
+        if any(_matches_header(line, header) for line in header_lines)
+    )
+    date_ranges = len(_DATE_RANGE_RE.findall(normalized))
+    has_email = bool(_EMAIL_RE.search(normalized))
+    has_phone = bool(_PHONE_RE.search(normalized))
+    has_profile = bool(_PROFILE_RE.search(normalized))
+
+    word_set = set(words)
+    resume_density = sum(1 for word in words if word in _RESUME_TERMS) / len(words)
+    non_resume_terms = sum(
+        1 for term in _NON_RESUME_TERMS
+        if (term in normalized if " " in term else term in word_set)
+    )
+
+    logit = (
+        -4.0
+        + 0.8 * min(sections, 5)
+        + 0.6 * min(date_ranges, 4)
+        + 0.8 * has_email
+        + 0.6 * has_phone
+        + 0.5 * has_profile
+        + 40.0 * min(resume_density, 0.08)
+        - 0.9 * non_resume_terms
+    )
+    return 1.0 / (1.0 + math.exp(-logit)), non_resume_terms
+
+
+def classify_resume_text(text: str) -> bool | None:
+    """
+    Classifica localmente se um texto é um currículo.
+
+    A rejeição local exige evidência positiva de outro tipo de documento (termos
+    de receitas, contratos, faturas); uma pontuação baixa apenas pela ausência de
+    sinais de currículo (ex.: cabeçalhos fora da lista) segue para o LLM.
+
+    Retorna:
+        True ou False para decisões de alta confiança, ou None quando o texto
+        está na faixa de incerteza e deve ser validado pelo LLM.
+    """
+    score, non_resume_terms = _score_signals(text)
+    if score >= RESUME_ACCEPT_THRESHOLD:
+        return True
+    if score <= RESUME_REJECT_THRESHOLD and non_resume_terms > 0:
+        return False
+    return None
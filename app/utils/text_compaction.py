@@ -0,0 +1,194 @@
+import re
+from collections import Counter
+
+from .resume_classifier import is_section_header
+from ..config.constants import RESUME_TOKEN_BUDGET, CHARS_PER_TOKEN
+
+_PAGE_MARKER_RE = re.compile(r"^\s*--- Página \d+ ---\s*$", re.MULTILINE)
+_SPACES_RE = re.compile(r"\s+")
+_WORD_RE = re.compile(r"[^\W\d_]{2,}")
+_DIGITS_RE = re.compile(r"\d+")
+# Itens de listas de habilidades, inclusive de uma letra (ex.: "C", "C++", "C#", "R", "Node.js")
+_TERM_RE = re.compile(r"[^\W\d_][\w+#.]*")
+_LIST_SEPARATORS_RE = re.compile(r"\s*[,;/|]\s*")
+# Linhas de cabeçalho/rodapé candidatas a repetição em cada página
+_PAGE_EDGE_LINES = 3
+_TRUNCATION_MARK = "[...]"
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimativa simples do número de tokens de um texto (CHARS_PER_TOKEN caracteres por token)."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _is_noise(line: str) -> bool:
+    """
+    Identifica linhas sem conteúdo útil, típicas de lixo de OCR.
+
+    Linhas sem nenhuma palavra ou em que a maior parte dos caracteres não
+    pertence a palavras (ex.: "|| ~ ._ ;'") são descartadas. Linhas curtas
+    com dígitos (datas, telefones) e listas de termos (ex.: "C, C++, C#") são
+    mantidas.
+    """
+    if _is_term_list(line):
+        return False
+    words = _WORD_RE.findall(line)
+    if not words:
+        return not any(char.isdigit() for char in line) or len(line) < 4
+    word_chars = sum(len(word) for word in words)
+    visible_chars = sum(1 for char in line if not char.isspace())
+    return word_chars / visible_chars < 0.4
+
+
+def _is_term_list(line: str) -> bool:
+    """Indica se a linha é uma lista de termos separados por vírgula, barra etc. (ex.: "C, C++, C#")."""
+    items = [item for item in _LIST_SEPARATORS_RE.split(line.strip()) if item]
+    return len(items) >= 2 and all(_TERM_RE.fullmatch(item) for item in items)
+
+
+def _furniture_key(line: str) -> str:
+    """Chave de comparação de cabeçalhos/rodapés: ignora caixa e números (ex.: "Página 2 de 3")."""
+    return _DIGITS_RE.sub("#", line.lower())
+
+
+def _clean_pages(text: str) -> list[list[str]]:
+    """Separa o texto em páginas, normalizando espaços e descartando linhas de ruído."""
+    pages = []
+    for page in _PAGE_MARKER_RE.split(text):
+        lines = []
+        for raw in page.splitlines():
+            line = _SPACES_RE.sub(" ", raw).strip()
+            if not line:
+                # Preserva no máximo uma linha em branco consecutiva
+                if lines and lines[-1]:
+                    lines.append("")
+                continue
+            if not _is_noise(line):
+                lines.append(line)
+        while lines and not lines[-1]:
+            lines.pop()
+        if lines:
+            pages.append(lines)
+    return pages
+
+
+def _remove_page_furniture(pages: list[list[str]]) -> list[list[str]]:
+    """
+    Remove cabeçalhos e rodapés repetidos entre páginas.
+
+    Linhas próximas ao topo ou ao fim da página que se repetem em mais da
+    metade das páginas são mantidas apenas na primeira ocorrência.
+    """
+    if len(pages) < 2:
+        return pages
+
+    def edge_keys(lines: list[str]) -> set[str]:
+        edges = lines[:_PAGE_EDGE_LINES] + lines[-_PAGE_EDGE_LINES:]
+        return {_furniture_key(line) for line in edges if line}
+
+    occurrences = Counter(key for lines in pages for key in edge_keys(lines))
+    furniture = {key for key, count in occurrences.items() if count > 1 and count * 2 > len(pages)}
+    if not furniture:
+        return pages
+
+    seen = set()
+    compacted = []
+    for lines in pages:
+        page_edges = edge_keys(lines)
+        kept = []
+        for line in lines:
+            key = _furniture_key(line)
+            if key in furniture and key in page_edges:
+                if key in seen:
+                    continue
+                seen.add(key)
+            kept.append(line)
+        compacted.append(kept)
+    return compacted
+
+
+def _split_sections(lines: list[str]) -> list[list[str]]:
+    """Agrupa as linhas em seções, iniciando uma nova seção a cada cabeçalho reconhecido."""
+    sections = [[]]
+    for line in lines:
+        if line and is_section_header(line) and sections[-1]:
+            sections.append([])
+        sections[-1].append(line)
+    return [section for section in sections if section]
+
+
+def _allocate_budget(sizes: list[int], budget: int) -> list[int]:
+    """Distribui o orçamento entre as seções: seções pequenas ficam inteiras e o restante é dividido igualmente."""
+    allocation = [0] * len(sizes)
+    remaining = budget
+    pending = sorted(range(len(sizes)), key=lambda i: sizes[i])
+    while pending:
+        share = remaining // len(pending)
+        index = pending[0]
+        if sizes[index] <= share:
+            allocation[index] = sizes[index]
+            remaining -= sizes[index]
+            pending.pop(0)
+        else:
+            for index in pending:
+                allocation[index] = share
+            break
+    return allocation
+
+
+def _truncate_section(lines: list[str], max_chars: int) -> list[str]:
+    """Mantém o início da seção (cabeçalho e itens mais relevantes) até o limite de caracteres, cortando a última linha que não couber."""
+    kept = []
+    used = 0
+    for line in lines:
+        if used + len(line) + 1 > max_chars:
+            # Linhas longas (ex.: parágrafos inteiros) são cortadas no espaço restante, na última palavra completa
+            remaining = max_chars - used - 1
+            cut = line[:remaining].rsplit(" ", 1)[0] if remaining > 0 and " " in line[:remaining] else line[:max(remaining, 0)]
+            if cut.strip():
+                kept.append(cut.rstrip())
+            kept.append(_TRUNCATION_MARK)
+            break
+        kept.append(line)
+        used += len(line) + 1
+    return kept
+
+
+def compact_resume_text(text: str, max_tokens: int = RESUME_TOKEN_BUDGET) -> str:
+    """
+    Compacta o texto de um currículo antes de enviá-lo ao LLM.
+
+    Etapas:
+        1. Remove os marcadores de página e normaliza espaços
+        2. Descarta linhas de ruído (sem palavras ou com poucos caracteres de palavras)
+        3. Remove cabeçalhos e rodapés repetidos entre páginas
+        4. Se o texto exceder max_tokens, trunca cada seção do currículo
+           proporcionalmente, preservando o início de todas as seções
+
+    Parâmetros:
+        text: texto extraído do currículo
+        max_tokens: orçamento de tokens do texto compactado
+
+    Retorna:
+        Texto compactado.
+    """
+    pages = _remove_page_furniture(_clean_pages(text))
+    lines = []
+    for page in pages:
+        if lines and lines[-1]:
+            lines.append("")
+        lines.extend(page)
+
+    compacted = "\n".join(lines)
+    if estimate_tokens(compacted) <= max_tokens:
+        return compacted
+
+    sections = _split_sections(lines)
+    sizes = [sum(len(line) + 1 for line in section) for section in sections]
+    # Reserva espaço para as marcas de truncamento de cada seção
+    budget = max(max_tokens * CHARS_PER_TOKEN - len(sections) * (len(_TRUNCATION_MARK) + 1), 0)
+
+    truncated = []
+    for section, size, allocation in zip(sections, sizes, _allocate_budget(sizes, budget)):
+        truncated.extend(section if allocation >= size else _truncate_section(section, allocation))
+    return "\n".join(truncated).strip()
@@ -1,49 +1,78 @@
-import os
+import asyncio
 import base64
 import logging
-from groq import Groq
 from pydantic import BaseModel, Field
-from PIL import Image
+from PIL import Image, ImageOps
 import io
 
-logger = logging.getLogger(__name__)
-
-client = Groq(
-    api_key=os.getenv("GROQ_API_KEY"),
+from ..services.circuit_breaker import CircuitOpenError
+from ..services.llm_scheduler import create_chat_completion, provider_available
+from .resume_classifier import classify_resume_text
+from .text_compaction import compact_resume_text
+from ..config.constants import (
+    VALIDATION_THUMBNAIL_MAX_SIDE, VALIDATION_THUMBNAIL_QUALITY, VALIDATION_THUMBNAIL_GRAYSCALE,
+    VALIDATION_TOKEN_BUDGET
 )
 
+logger = logging.getLogger(__name__)
+
 MAX_RETRIES = 3
 
 class ValidationError(BaseModel):
     error: str = Field(..., description="Mensagem de erro na validação")
+    unavailable: bool = Field(False, description="Indica que o provedor está indisponível (circuit breaker aberto)")
 
-def validate_image_content(image_bytes: bytes, filename: str) -> bool | ValidationError:
+def get_thumbnail(image: bytes | Image.Image) -> str:
+    """
+    Gera a miniatura (JPEG em base64) enviada ao modelo de visão.
+
+    Reduz a imagem a VALIDATION_THUMBNAIL_MAX_SIDE, converte (opcionalmente) para
+    escala de cinza e codifica em JPEG. Roda nos workers de OCR, fora do event loop;
+    o cache das miniaturas fica no processo principal (ocr_service).
+    """
+    max_size = (VALIDATION_THUMBNAIL_MAX_SIDE, VALIDATION_THUMBNAIL_MAX_SIDE)
+    if isinstance(image, bytes):
+        image = Image.open(io.BytesIO(image))
+        # JPEGs são decodificados já reduzidos (modo draft), sem materializar a resolução cheia
+        image.draft("L" if VALIDATION_THUMBNAIL_GRAYSCALE else "RGB", max_size)
+        # Fotos de celular: aplica a orientação EXIF antes de enviar ao modelo
+        image = ImageOps.exif_transpose(image)
+
+    # Remove o canal alpha sobre fundo branco
+    if image.mode in ('RGBA', 'LA'):
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.split()[-1])
+        image = background
+
+    mode = 'L' if VALIDATION_THUMBNAIL_GRAYSCALE else 'RGB'
+    if image.mode != mode:
+        image = image.convert(mode)
+    else:
+        image = image.copy()
+    image.thumbnail(max_size)
+
+    buffered = io.BytesIO()
+    image.save(buffered, format="JPEG", quality=VALIDATION_THUMBNAIL_QUALITY, optimize=True)
+    logger.debug(f"🖼️ Miniatura de validação gerada: {image.size[0]}x{image.size[1]} ({buffered.tell() // 1024}KB)")
+    return base64.b64encode(buffered.getvalue()).decode('utf-8')
+
+def _retries_exhausted(filename: str, last_error: str) -> ValidationError:
+    """Erro retornado quando nenhuma tentativa obteve True ou False do modelo."""
+    logger.error(f"❌ Todas as tentativas de validação falharam para {filename}. Último erro: {last_error}")
+    # Se as falhas abriram o circuito do provedor, o arquivo segue no modo degradado
+    return ValidationError(error=f"Validação não concluída: {last_error}", unavailable=not provider_available())
+
+async def validate_image_content(thumbnail: str, filename: str) -> bool | ValidationError:
     """
     Usa o modelo de visão da Groq para validar se a imagem contém um currículo.
     
     Args:
-        image_bytes: Bytes da imagem
+        thumbnail: Miniatura da imagem (JPEG em base64), gerada por get_thumbnail
         
     Returns:
         bool ou ValidationError
     """
     try:
-        # Converte bytes para PIL Image e depois para base64
-        image = Image.open(io.BytesIO(image_bytes))
-        
-        # Converte para RGB se necessário (remove canal alpha)
-        if image.mode in ('RGBA', 'LA'):
-            background = Image.new('RGB', image.size, (255, 255, 255))
-            background.paste(image, mask=image.split()[-1] if image.mode == 'RGBA' else None)
-            image = background
-        elif image.mode != 'RGB':
-            image = image.convert('RGB')
-        
-        # Converte para base64
-        buffered = io.BytesIO()
-        image.save(buffered, format="JPEG", quality=85)
-        img_base64 = base64.b64encode(buffered.getvalue()).decode('utf-8')
-        
         system_prompt = """
         Você é um especialista em análise de documentos e identificação de currículos.
         Sua tarefa é analisar um texto e determinar se ele é um currículo/CV ou não.
@@ -63,9 +92,14 @@ def validate_image_content(image_bytes: bytes, filename: str) -> bool | Validati
         Note que é possível encontrar outros tipos de documentos que possuam uma estrutura similar a um currículo/CV, mas que não sejam currículos/CVs.
         """
 
+        last_error = "resposta inconclusiva do modelo"
         for i in range(MAX_RETRIES):
+            # Atraso entre tentativas (a primeira é imediata; 429s são tratados pelo escalonador)
+            if i > 0:
+                await asyncio.sleep(0.5 * i)
+
             try:
-                response = client.chat.completions.create(
+                response = await create_chat_completion(
                     messages=[
                         {
                             "role": "system",
@@ -81,7 +115,7 @@ def validate_image_content(image_bytes: bytes, filename: str) -> bool | Validati
                                 {
                                     "type": "image_url",
                                     "image_url": {
-                                        "url": f"data:image/jpeg;base64,{img_base64}"
+                                        "url": f"data:image/jpeg;base64,{thumbnail}"
                                     }
                                 }
                             ]
@@ -102,17 +136,21 @@ def validate_image_content(image_bytes: bytes, filename: str) -> bool | Validati
                 if "true" in res.lower():
                     return True
 
+            except CircuitOpenError as e:
+                return ValidationError(error=str(e), unavailable=True)
             except Exception as e:
+                last_error = str(e)
                 logger.warning(f"⚠️ Tentativa {i+1}/{MAX_RETRIES} falhou para validação de imagem {filename}")
                 continue
 
-        return False
+        # Sem veredito do modelo: a falha não é uma rejeição e não deve ser armazenada como tal
+        return _retries_exhausted(filename, last_error)
 
     except Exception as e:
         logger.error(f"❌ Erro crítico na validação de imagem {filename}: {e}")
         return ValidationError(error=f"Erro ao processar imagem: {str(e)}")
 
-def validate_text_content(text: str, filename: str) -> bool | ValidationError:
+async def validate_text_content(text: str, filename: str) -> bool | ValidationError:
     """
     Usa o modelo de texto da Groq para validar se o texto é de um currículo.
     
@@ -123,6 +161,12 @@ def validate_text_content(text: str, filename: str) -> bool | ValidationError:
     Returns:
         ValidationResponse ou ValidationError
     """
+    # Decisões de alta confiança do classificador local dispensam a chamada ao LLM
+    verdict = classify_resume_text(text)
+    if verdict is not None:
+        logger.debug(f"⚡ Texto classificado localmente ({'currículo' if verdict else 'não currículo'}): {filename}")
+        return verdict
+
     try:
         logger.debug(f"🔍 Iniciando validação de texto com IA: {filename}")
         
@@ -146,7 +190,7 @@ def validate_text_content(text: str, filename: str) -> bool | ValidationError:
 
         ---
         TEXTO:
-        {text[:3000]}
+        {compact_resume_text(text, VALIDATION_TOKEN_BUDGET)}
         ---
 
         Responda APENAS com True ou False.
@@ -154,9 +198,14 @@ def validate_text_content(text: str, filename: str) -> bool | ValidationError:
         False se o texto não for de um currículo/CV
         """
 
+        last_error = "resposta inconclusiva do modelo"
         for i in range(MAX_RETRIES):
+            # Atraso entre tentativas (a primeira é imediata; 429s são tratados pelo escalonador)
+            if i > 0:
+                await asyncio.sleep(0.5 * i)
+
             try:
-                response = client.chat.completions.create(
+                response = await create_chat_completion(
                     model="meta-llama/llama-4-scout-17b-16e-instruct",
                     messages=[
                         {"role": "system", "content": system_prompt},
@@ -176,11 +225,15 @@ def validate_text_content(text: str, filename: str) -> bool | ValidationError:
                 if "true" in res.lower():
                     return True
 
+            except CircuitOpenError as e:
+                return ValidationError(error=str(e), unavailable=True)
             except Exception as e:
+                last_error = str(e)
                 logger.warning(f"⚠️ Tentativa {i+1}/{MAX_RETRIES} falhou para validação do PDF {filename}")
                 continue
 
-        return False
+        # Sem veredito do modelo: a falha não é uma rejeição e não deve ser armazenada como tal
+        return _retries_exhausted(filename, last_error)
 
     except Exception as e:
         logger.error(f"❌ Erro crítico na validação de texto {filename}: {e}")
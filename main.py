@@ -1,10 +1,13 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
+import asyncio
 import logging
 import time
 
-from app.routers import analysis
+from app.routers import analysis, metrics
 from app.services.database_service import close_database_connection
+from app.services.ocr_pool import start_ocr_pool, shutdown_ocr_pool
+from app.services.llm_client import start_llm_client, close_llm_client
 from app.config.logging_config import setup_logging
 
 # Configurar logging
@@ -25,6 +28,8 @@ async def lifespan(app: FastAPI):
     
     try:
         # Aqui poderiam ser adicionadas validações de dependências
+        start_ocr_pool()
+        start_llm_client()
         logger.info("✅ Aplicação inicializada com sucesso")
     except Exception as e:
         logger.critical(f"❌ Falha crítica na inicialização: {e}")
@@ -35,6 +40,8 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("🔄 Encerrando aplicação...")
     try:
+        await asyncio.to_thread(shutdown_ocr_pool)
+        await close_llm_client()
         await close_database_connection()
         shutdown_time = time.time() - start_time
         logger.info(f"✅ Aplicação encerrada com sucesso - Uptime: {shutdown_time:.1f}s")
@@ -67,6 +74,7 @@ Analise currículos automaticamente usando OCR e Inteligência Artificial.
 
 # Inclusão dos routers
 app.include_router(analysis.router)
+app.include_router(metrics.router)
 
 if __name__ == "__main__":
     import uvicorn